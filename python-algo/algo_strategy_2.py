@@ -3,7 +3,6 @@ import random
 import math
 import warnings
 from sys import maxsize
-import json
 
 class AlgoStrategy(gamelib.AlgoCore):
     def __init__(self):
@@ -130,8 +129,10 @@ class AlgoStrategy(gamelib.AlgoCore):
 
     def least_damage_spawn_location(self, game_state, location_options):
         damages = []
+        path_table = game_state.spawn_path_table()
         for location in location_options:
-            path = game_state.find_path_to_edge(location)
+            entry = path_table.get(location)
+            path = entry.path if entry is not None else game_state.find_path_to_edge(location)
             damage = 0
             for path_location in path:
                 damage += len(game_state.get_attackers(path_location, 0)) * gamelib.GameUnit(TURRET, game_state.config).damage_i
@@ -140,11 +141,10 @@ class AlgoStrategy(gamelib.AlgoCore):
 
     def detect_enemy_unit(self, game_state, unit_type=None, valid_x=None, valid_y=None):
         total_units = 0
-        for location in game_state.game_map:
-            if game_state.contains_stationary_unit(location):
-                for unit in game_state.game_map[location]:
-                    if unit.player_index == 1 and (unit_type is None or unit.unit_type == unit_type) and (valid_x is None or location[0] in valid_x) and (valid_y is None or location[1] in valid_y):
-                        total_units += 1
+        for location in game_state.game_map.iter_structures(1):
+            for unit in game_state.game_map[location]:
+                if unit.player_index == 1 and (unit_type is None or unit.unit_type == unit_type) and (valid_x is None or location[0] in valid_x) and (valid_y is None or location[1] in valid_y):
+                    total_units += 1
         return total_units
 
     def filter_blocked_locations(self, locations, game_state):
@@ -155,7 +155,7 @@ class AlgoStrategy(gamelib.AlgoCore):
         return filtered
 
     def on_action_frame(self, turn_string):
-        state = json.loads(turn_string)
+        state = gamelib.parse_json(turn_string)
         events = state["events"]
         breaches = events["breach"]
         for breach in breaches:
@@ -3,7 +3,6 @@ import random
 import math
 import warnings
 from sys import maxsize
-import json
 
 class AlgoStrategy(gamelib.AlgoCore):
     def __init__(self):
@@ -101,17 +100,16 @@ class AlgoStrategy(gamelib.AlgoCore):
 
     def detect_enemy_unit(self, game_state, unit_type=None, valid_x=None, valid_y=None):
         total_units = 0
-        for location in game_state.game_map:
-            if game_state.contains_stationary_unit(location):
-                for unit in game_state.game_map[location]:
-                    if unit.player_index == 1 and (unit_type is None or unit.unit_type == unit_type):
-                        if (valid_x is None or location[0] in valid_x) and (valid_y is None or location[1] in valid_y):
-                            total_units += 1
+        for location in game_state.game_map.iter_structures(1):
+            for unit in game_state.game_map[location]:
+                if unit.player_index == 1 and (unit_type is None or unit.unit_type == unit_type):
+                    if (valid_x is None or location[0] in valid_x) and (valid_y is None or location[1] in valid_y):
+                        total_units += 1
         return total_units
 
     def detect_enemy_mobile_units(self, game_state, unit_type):
         count = 0
-        for location in game_state.game_map:
+        for location in game_state.game_map.iter_occupied():
             if not game_state.contains_stationary_unit(location):
                 units = game_state.game_map[location]
                 for unit in units:
@@ -120,7 +118,7 @@ class AlgoStrategy(gamelib.AlgoCore):
         return count
 
     def on_action_frame(self, turn_string):
-        state = json.loads(turn_string)
+        state = gamelib.parse_json(turn_string)
         events = state["events"]
         breaches = events["breach"]
         for breach in breaches:
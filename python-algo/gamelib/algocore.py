@@ -1,7 +1,5 @@
-import json
-
 from .game_state import GameState
-from .util import get_command, debug_write, BANNER_TEXT, send_command
+from .util import get_command, debug_write, BANNER_TEXT, send_command, parse_json
 
 class AlgoCore(object):
     """
@@ -61,15 +59,16 @@ class AlgoCore(object):
                 """
                 This means this must be the config file. So, load in the config file as a json and add it to your AlgoStrategy class.
                 """
-                parsed_config = json.loads(game_state_string)
+                parsed_config = parse_json(game_state_string)
                 self.on_game_start(parsed_config)
             elif "turnInfo" in game_state_string:
-                state = json.loads(game_state_string)
+                state = parse_json(game_state_string)
                 stateType = int(state.get("turnInfo")[0])
                 if stateType == 0:
                     """
                     This is the game turn game state message. Algo must now print to stdout 2 lines, one for build phase one for
                     deploy phase. Printing is handled by the provided functions.
+                    The string has just been decoded, so GameState and parse_json reuse the result instead of decoding it again.
                     """
                     self.on_turn(game_state_string)
                 elif stateType == 1:
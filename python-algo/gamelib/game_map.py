@@ -1,7 +1,93 @@
+import copy
 import math
+import random
 from .unit import GameUnit
 from .util import debug_write
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#Random 64 bit keys for Zobrist hashing, one per tile index x * 28 + y.
+#They are seeded so that a given layout always hashes to the same value.
+_zobrist_random = random.Random(0x7e51a1)
+_BLOCKED_KEYS = tuple(_zobrist_random.getrandbits(64) for _ in range(28 * 28))
+#Keys for the structure hash, indexed by ((tile index * 2 + player) * 8 + unit type index) * 2 + upgraded.
+_STRUCTURE_KEYS = tuple(_zobrist_random.getrandbits(64) for _ in range(28 * 28 * 2 * 8 * 2))
+
+def _build_arena_mask():
+    """Precomputes which locations of the 28 x 28 square are inside the diamond shaped arena
+    """
+    mask = []
+    for x in range(28):
+        mask.append(bytes([1 if (y < 14 and 13 - y <= x <= 14 + y) or (y >= 14 and y - 14 <= x <= 41 - y) else 0 for y in range(28)]))
+    return tuple(mask)
+
+#ARENA_MASK[x][y] is 1 for locations inside the arena and 0 for the rest of the square
+ARENA_MASK = _build_arena_mask()
+#The same mask as a read only 28 x 28 NumPy array of bools indexed [x, y], or None if NumPy is not installed
+if np is not None:
+    ARENA_MASK_ARRAY = np.array([list(row) for row in ARENA_MASK], dtype=bool)
+    ARENA_MASK_ARRAY.flags.writeable = False
+else:
+    ARENA_MASK_ARRAY = None
+
+def _build_tile_ids():
+    """Numbers the locations of the diamond shaped arena.
+
+    Returns:
+        * The (x, y) location of every tile id, in the order GameMap iterates over them: by row from the bottom, then left to right
+        * For every index x * 28 + y, the tile id of that location, or -1 if it is outside the arena
+
+    """
+    locations = []
+    tile_ids = [-1] * (28 * 28)
+    for y in range(28):
+        for x in range(28):
+            if ARENA_MASK[x][y]:
+                tile_ids[x * 28 + y] = len(locations)
+                locations.append((x, y))
+    return tuple(locations), tuple(tile_ids)
+
+#Canonical integer ids for the locations in the arena, see GameMap.get_tile_id
+TILE_LOCATIONS, TILE_IDS = _build_tile_ids()
+TILE_COUNT = len(TILE_LOCATIONS)
+
+def _build_edges():
+    """Precomputes the locations along the four edges of the arena, in the order get_edges returns them
+
+    Returns:
+        * A tuple of the four edges, top right, top left, bottom left and bottom right, each a tuple of (x, y) locations
+        * A bytes object indexed by x * 28 + y with bit 1 << edge set for every edge the location is on
+
+    """
+    top_right = tuple((14 + num, 27 - num) for num in range(14))
+    top_left = tuple((13 - num, 27 - num) for num in range(14))
+    bottom_left = tuple((13 - num, num) for num in range(14))
+    bottom_right = tuple((14 + num, num) for num in range(14))
+    edges = (top_right, top_left, bottom_left, bottom_right)
+    edge_mask = bytearray(28 * 28)
+    for edge, edge_locations in enumerate(edges):
+        for x, y in edge_locations:
+            edge_mask[x * 28 + y] |= 1 << edge
+    return edges, bytes(edge_mask)
+
+#The locations along each edge, indexed by GameMap.TOP_RIGHT, TOP_LEFT, BOTTOM_LEFT and BOTTOM_RIGHT
+EDGES, EDGE_MASK = _build_edges()
+
+def _build_range_offsets(radius, hit_radius):
+    """Gets the (dx, dy) offsets of the locations within radius + hit_radius of a location,
+    in the order get_locations_in_range visits them
+    """
+    search_radius = math.ceil(radius)
+    offsets = []
+    for dx in range(-search_radius, search_radius + 1):
+        for dy in range(-search_radius, search_radius + 1):
+            if math.sqrt(dx**2 + dy**2) < radius + hit_radius:
+                offsets.append((dx, dy))
+    return tuple(offsets)
+
 class GameMap:
     """Holds data about the current game map and provides functions
     useful for getting information related to the map.
@@ -9,6 +95,11 @@ class GameMap:
     game_map[x, y] will return a list of Units located at that location, 
     or an empty list if there are no units at the location
 
+    Pathing, get_attackers and the other queries read data derived from those lists.
+    add_unit, remove_unit and game_map[x, y] = units keep it up to date; if you edit
+    the list or its units in place, for example with append, clear or upgrade, call
+    refresh_location(location) afterwards.
+
     Attributes :
         * config (JSON): Contains information about the current game rules
         * enable_warnings (bool): If true, debug messages for game_map functions will print out
@@ -19,6 +110,9 @@ class GameMap:
         * BOTTOM_LEFT (int): Hidden challenge! Can you guess what this constant represents???
         * BOTTOM_RIGHT (int): A constant that represents the bottom right edge
 
+    Locations can also be referred to by an integer tile id, see get_tile_id. The module level
+    TILE_LOCATIONS and TILE_IDS tables convert between ids and locations in O(1).
+
     """
     def __init__(self, config):
         """Initializes constants and game map
@@ -36,7 +130,41 @@ class GameMap:
         self.BOTTOM_LEFT = 2
         self.BOTTOM_RIGHT = 3
         self.__map = self.__empty_grid()
-        self.__start = [13,0]
+        self.__blocked = bytearray(self.ARENA_SIZE * self.ARENA_SIZE)
+        self.__blocked_hash = 0
+        self.__structure_keys = [0] * (self.ARENA_SIZE * self.ARENA_SIZE)
+        self.__structure_hash = 0
+        self.__type_indices = {}
+        for i, unit_info in enumerate(config.get("unitInformation", [])):
+            self.__type_indices[unit_info.get("shorthand")] = i
+        #Range queries are answered from offset tables, built up front for every range in the config
+        unit_information = config.get("unitInformation", [])
+        self.__hit_radius = unit_information[0].get('getHitRadius', 0) if unit_information else 0
+        self.__range_offsets = {}
+        self.__range_tile_ids = {}
+        self.__range_rings = {}
+        for unit_info in unit_information:
+            for type_config in (unit_info, unit_info.get("upgrade", {})):
+                for range_name in ("attackRange", "shieldRange"):
+                    radius = type_config.get(range_name)
+                    if radius is not None and not radius in self.__range_offsets:
+                        self.__range_offsets[radius] = _build_range_offsets(radius, self.__hit_radius)
+        #Attack coverage by player: for each tile id, the tile ids of that player's attackers in range of it
+        #mapped to the damage they deal to mobile units there. Sources are recomputed lazily after they change.
+        self.__max_attack_range = 0
+        for unit_info in unit_information:
+            if unit_info.get('attackRange', 0) >= self.__max_attack_range:
+                self.__max_attack_range = unit_info.get('attackRange', 0)
+        self.__coverage = [[None] * TILE_COUNT, [None] * TILE_COUNT]
+        self.__covered_tiles = [None] * TILE_COUNT
+        self.__stale_coverage = set()
+        self.__attack_targets = {}
+        self.__occupied = set()
+        self.__structures = [set(), set()]
+        #Occupancy index by player and unit type: the tile ids holding each type, and how many units of it there are
+        self.__unit_tiles = [{}, {}]
+        self.__unit_counts = [{}, {}]
+        self.__tile_unit_counts = [None] * TILE_COUNT
     
     def __getitem__(self, location):
         if len(location) == 2 and self.in_arena_bounds(location):
@@ -47,25 +175,73 @@ class GameMap:
     def __setitem__(self, location, val):
         if type(location) == tuple and len(location) == 2 and self.in_arena_bounds(location):
             self.__map[location[0]][location[1]] = val
+            self._update_location(location[0], location[1])
             return
         self._invalid_coordinates(location)
 
     def __iter__(self):
-        self.__start = [13,0]
-        return self
-    
-    def __next__(self):
-        location = self.__start
-        if location == [15,27]:
-            raise StopIteration
-        new_location = [location[0]+1, location[1]]
-        while not self.in_arena_bounds(new_location) and not location == [14,27]:
-            if new_location[0] == self.ARENA_SIZE:
-                new_location = [0, new_location[1]+1]
-            else:
-                new_location = [new_location[0]+1, new_location[1]]
-        self.__start = new_location
-        return location 
+        #Each iteration gets its own generator, so nested loops over the map work
+        for x, y in TILE_LOCATIONS:
+            yield [x, y]
+
+    def iter_occupied(self):
+        """Iterates over the locations that contain at least one unit, in map iteration order
+
+        Yields:
+            The [x, y] location of every occupied tile
+
+        """
+        for tile_id in sorted(self.__occupied):
+            yield list(TILE_LOCATIONS[tile_id])
+
+    def iter_structures(self, player_index=None):
+        """Iterates over the locations that contain a structure, in map iteration order
+
+        Args:
+            player_index: Only yield structures owned by this player, 0 for you 1 for the enemy. Yields every structure if None.
+
+        Yields:
+            The [x, y] location of every matching structure
+
+        """
+        if player_index is None:
+            tile_ids = self.__structures[0] | self.__structures[1]
+        else:
+            tile_ids = self.__structures[player_index]
+        for tile_id in sorted(tile_ids):
+            yield list(TILE_LOCATIONS[tile_id])
+
+    def get_unit_count(self, unit_type, player_index=0):
+        """Counts the units of a type controlled by a player, in O(1)
+
+        Args:
+            unit_type: The type of unit to count. Use the constants provided in algo_strategy.
+            player_index: The index corresponding to the player controlling the units, 0 for you 1 for the enemy
+
+        Returns:
+            The number of matching units on the map
+
+        """
+        if player_index < 0 or player_index > 1:
+            self.warn("Player index {} is invalid. Player index should be 0 or 1.".format(player_index))
+            return 0
+        return self.__unit_counts[player_index].get(unit_type, 0)
+
+    def get_unit_locations(self, unit_type, player_index=0):
+        """Gets the locations holding units of a type controlled by a player, in map iteration order
+
+        Args:
+            unit_type: The type of unit to find. Use the constants provided in algo_strategy.
+            player_index: The index corresponding to the player controlling the units, 0 for you 1 for the enemy
+
+        Returns:
+            A list of the [x, y] locations with at least one matching unit
+
+        """
+        if player_index < 0 or player_index > 1:
+            self.warn("Player index {} is invalid. Player index should be 0 or 1.".format(player_index))
+            return []
+        return [list(TILE_LOCATIONS[tile_id]) for tile_id in sorted(self.__unit_tiles[player_index].get(unit_type, ()))]
 
     def __empty_grid(self):
         grid = []
@@ -78,6 +254,227 @@ class GameMap:
     def _invalid_coordinates(self, location):
         self.warn("{} is out of bounds.".format(str(location)))
 
+    def _update_location(self, x, y):
+        """Refreshes the cached data derived from the units at a location.
+        Must be called whenever the list of units at [x, y] changes.
+        """
+        index = x * self.ARENA_SIZE + y
+        blocked = 0
+        structure_key = 0
+        for unit in self.__map[x][y]:
+            if unit.stationary:
+                blocked = 1
+                player = 1 if unit.player_index == 1 else 0
+                key_index = ((index * 2 + player) * 8 + self.__type_indices.get(unit.unit_type, 0)) * 2 + int(unit.upgraded)
+                structure_key = _STRUCTURE_KEYS[key_index]
+                break
+        if not self.__blocked[index] == blocked:
+            self.__blocked[index] = blocked
+            self.__blocked_hash ^= _BLOCKED_KEYS[index]
+        if not self.__structure_keys[index] == structure_key:
+            self.__structure_hash ^= self.__structure_keys[index] ^ structure_key
+            self.__structure_keys[index] = structure_key
+
+        #Occupancy is only tracked for locations inside the arena
+        tile_id = TILE_IDS[index]
+        if tile_id < 0:
+            return
+        self.__stale_coverage.add(tile_id)
+        if self.__map[x][y]:
+            self.__occupied.add(tile_id)
+        else:
+            self.__occupied.discard(tile_id)
+        self.__structures[0].discard(tile_id)
+        self.__structures[1].discard(tile_id)
+        if blocked:
+            self.__structures[player].add(tile_id)
+
+        old_counts = self.__tile_unit_counts[tile_id]
+        if old_counts:
+            for (unit_player, unit_type), count in old_counts.items():
+                self.__unit_tiles[unit_player][unit_type].discard(tile_id)
+                self.__unit_counts[unit_player][unit_type] -= count
+        new_counts = {}
+        for unit in self.__map[x][y]:
+            key = (1 if unit.player_index == 1 else 0, unit.unit_type)
+            new_counts[key] = new_counts.get(key, 0) + 1
+        for (unit_player, unit_type), count in new_counts.items():
+            self.__unit_tiles[unit_player].setdefault(unit_type, set()).add(tile_id)
+            self.__unit_counts[unit_player][unit_type] = self.__unit_counts[unit_player].get(unit_type, 0) + count
+        self.__tile_unit_counts[tile_id] = new_counts
+
+    def refresh_location(self, location):
+        """Updates the map's derived data after the units at a location were changed in place.
+        add_unit, remove_unit and game_map[x, y] = units do this for you.
+
+        Args:
+            location: The location whose list of units, or whose units, were modified
+
+        """
+        if not self.in_arena_bounds(location):
+            self._invalid_coordinates(location)
+            return
+        self._update_location(int(location[0]), int(location[1]))
+
+    def __refresh_coverage(self):
+        """
+        Recomputes the coverage of every tile whose units changed since the last query
+        """
+        for source in self.__stale_coverage:
+            covered_tiles = self.__covered_tiles[source]
+            if covered_tiles:
+                for player, targets in covered_tiles:
+                    coverage = self.__coverage[player]
+                    for target in targets:
+                        del coverage[target][source]
+            x, y = TILE_LOCATIONS[source]
+            damages = [{}, {}]
+            for unit in self.__map[x][y]:
+                if unit.damage_i + unit.damage_f > 0:
+                    player_damages = damages[1 if unit.player_index == 1 else 0]
+                    for target in self.__get_attack_targets(source, unit.attackRange):
+                        player_damages[target] = player_damages.get(target, 0) + unit.damage_i
+            covered_tiles = []
+            for player in (0, 1):
+                if not damages[player]:
+                    continue
+                coverage = self.__coverage[player]
+                for target, damage in damages[player].items():
+                    if coverage[target] is None:
+                        coverage[target] = {}
+                    coverage[target][source] = damage
+                covered_tiles.append((player, tuple(damages[player])))
+            self.__covered_tiles[source] = covered_tiles
+        self.__stale_coverage.clear()
+
+    def __get_attack_targets(self, source, attack_range):
+        """
+        Gets the tile ids a unit at source with the given attack range can attack, as get_attackers measures them
+        """
+        key = (source, attack_range)
+        targets = self.__attack_targets.get(key)
+        if targets is None:
+            x, y = TILE_LOCATIONS[source]
+            targets = []
+            for target in self._get_range_tile_ids(source, self.__max_attack_range):
+                target_x, target_y = TILE_LOCATIONS[target]
+                if math.sqrt((x - target_x)**2 + (y - target_y)**2) <= attack_range:
+                    targets.append(target)
+            targets = tuple(targets)
+            self.__attack_targets[key] = targets
+        return targets
+
+    def _get_attackers_at_tile(self, tile_id, player_index):
+        """
+        Gets the units of the other player that can attack a valid tile id, in the order get_attackers finds them
+        """
+        self.__refresh_coverage()
+        coverage = self.__coverage[1 - player_index][tile_id]
+        if not coverage:
+            return []
+        x, y = TILE_LOCATIONS[tile_id]
+        attackers = []
+        #get_attackers visits locations by x, then y
+        for source in sorted(coverage, key=TILE_LOCATIONS.__getitem__):
+            source_x, source_y = TILE_LOCATIONS[source]
+            distance = math.sqrt((x - source_x)**2 + (y - source_y)**2)
+            for unit in self.__map[source_x][source_y]:
+                if unit.damage_i + unit.damage_f > 0 and unit.player_index != player_index and distance <= unit.attackRange:
+                    attackers.append(unit)
+        return attackers
+
+    def _get_damage_at_tile(self, tile_id, player_index):
+        """
+        Gets the total damage per frame the other player's attackers deal to a mobile unit at a valid tile id
+        """
+        self.__refresh_coverage()
+        coverage = self.__coverage[1 - player_index][tile_id]
+        if not coverage:
+            return 0
+        return sum(coverage.values())
+
+    def get_blocked_mask(self):
+        """Gets the locations that are blocked by a structure
+
+        Returns:
+            A bytearray indexed by x * ARENA_SIZE + y that is 1 where a location contains a structure and 0 otherwise.
+            It is updated in place as units are added and removed, and should not be modified directly.
+
+        """
+        return self.__blocked
+
+    def get_blocked_hash(self):
+        """Gets a Zobrist hash of the locations that are blocked by a structure
+
+        Returns:
+            A 64 bit integer that identifies the current blocked locations, updated in O(1) as they change.
+            Maps with the same blocked locations have the same hash, so it can be used to key caches of paths.
+
+        """
+        return self.__blocked_hash
+
+    def get_structure_hash(self):
+        """Gets a Zobrist hash of the structures on the map
+
+        Returns:
+            A 64 bit integer that identifies the owner, type and upgrade status of the structure on every location.
+            It is updated in O(1) as structures are added, removed or upgraded, and equal layouts always have equal hashes,
+            so it can be used to key caches or to spot repeated positions across turns and replays.
+
+        """
+        return self.__structure_hash
+
+    def get_tile_id(self, location):
+        """Gets the tile id of a location.
+        Every location in the arena has an id between 0 and TILE_COUNT - 1, numbered in the order the map iterates over them.
+        Ids can be used to index flat lists instead of building [x, y] lists.
+
+        Args:
+            location: A map location
+
+        Returns:
+            The tile id of the location, or None if it is outside the arena or not a whole tile
+
+        """
+        x, y = location
+        if 0 <= x < self.ARENA_SIZE and 0 <= y < self.ARENA_SIZE and x == int(x) and y == int(y):
+            tile_id = TILE_IDS[int(x) * self.ARENA_SIZE + int(y)]
+            if tile_id >= 0:
+                return tile_id
+        self._invalid_coordinates(location)
+
+    def get_tile_location(self, tile_id):
+        """Gets the location of a tile id
+
+        Args:
+            tile_id: A tile id, see get_tile_id
+
+        Returns:
+            The [x, y] location of the tile, or None if the id is invalid
+
+        """
+        if 0 <= tile_id < TILE_COUNT:
+            return list(TILE_LOCATIONS[tile_id])
+        self._invalid_tile_id(tile_id)
+
+    def get_units_at_tile(self, tile_id):
+        """Gets the units at a tile id, the same list as game_map[x, y]
+
+        Args:
+            tile_id: A tile id, see get_tile_id
+
+        Returns:
+            A list of the units at the tile, or None if the id is invalid
+
+        """
+        if 0 <= tile_id < TILE_COUNT:
+            x, y = TILE_LOCATIONS[tile_id]
+            return self.__map[x][y]
+        self._invalid_tile_id(tile_id)
+
+    def _invalid_tile_id(self, tile_id):
+        self.warn("{} is not a valid tile id.".format(tile_id))
+
     def in_arena_bounds(self, location):
         """Checks if the given location is inside the diamond shaped game board.
 
@@ -89,6 +486,8 @@ class GameMap:
         
         """
         x, y = location
+        if type(x) == int and type(y) == int:
+            return 0 <= x < self.ARENA_SIZE and 0 <= y < self.ARENA_SIZE and ARENA_MASK[x][y] == 1
         half_board = self.HALF_ARENA
 
         row_size = y + 1
@@ -103,6 +502,25 @@ class GameMap:
 
         return bottom_half_check or top_half_check
 
+    def in_arena_bounds_many(self, locations):
+        """Checks which of several locations are inside the diamond shaped game board.
+
+        Args:
+            locations: A list of map locations
+
+        Returns:
+            A list with True for each location on the board and False otherwise, in order
+
+        """
+        size = self.ARENA_SIZE
+        in_bounds = []
+        for x, y in locations:
+            if type(x) == int and type(y) == int:
+                in_bounds.append(0 <= x < size and 0 <= y < size and ARENA_MASK[x][y] == 1)
+            else:
+                in_bounds.append(self.in_arena_bounds([x, y]))
+        return in_bounds
+
     def get_edge_locations(self, quadrant_description):
         """Takes in an edge description and returns a list of locations.
         
@@ -117,8 +535,7 @@ class GameMap:
             self.warn("Passed invalid quadrant_description '{}'. See the documentation for valid inputs for get_edge_locations.".format(quadrant_description))
             return
 
-        edges = self.get_edges()
-        return edges[quadrant_description]
+        return [list(location) for location in EDGES[quadrant_description]]
 
     def get_edges(self):
         """Gets all of the edges and their edge locations
@@ -127,35 +544,50 @@ class GameMap:
             A list with four lists inside of it of locations corresponding to the four edges.
             [0] = top_right, [1] = top_left, [2] = bottom_left, [3] = bottom_right.
         """
-        top_right = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA + num
-            y = self.ARENA_SIZE - 1 - num
-            top_right.append([int(x), int(y)])
-        top_left = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA - 1 - num
-            y = self.ARENA_SIZE - 1 - num
-            top_left.append([int(x), int(y)])
-        bottom_left = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA - 1 - num
-            y = num
-            bottom_left.append([int(x), int(y)])
-        bottom_right = []
-        for num in range(0, self.HALF_ARENA):
-            x = self.HALF_ARENA + num
-            y = num
-            bottom_right.append([int(x), int(y)])
-        return [top_right, top_left, bottom_left, bottom_right]
+        return [[list(location) for location in edge] for edge in EDGES]
+
+    def is_on_edge(self, location, quadrant_description=None):
+        """Checks in O(1) if a location is on an edge of the arena
+
+        Args:
+            location: A map location
+            quadrant_description: One of the edge constants, see game_map.TOP_LEFT and similar constants. Checks every edge if None.
+
+        Returns:
+            True if the location is on the requested edge, False otherwise
+
+        """
+        x, y = location
+        if not (0 <= x < self.ARENA_SIZE and 0 <= y < self.ARENA_SIZE and x == int(x) and y == int(y)):
+            return False
+        edges = EDGE_MASK[int(x) * self.ARENA_SIZE + int(y)]
+        if quadrant_description is None:
+            return edges != 0
+        return edges & (1 << quadrant_description) != 0
     
-    def add_unit(self, unit_type, location, player_index=0):
+    def get_edge_tile_ids(self, quadrant_description):
+        """Takes in an edge description and returns the tile ids along it, in the same order as get_edge_locations
+
+        Args:
+            quadrant_description: A constant corresponding to one of the 4 edges. See game_map.TOP_LEFT, game_map.BOTTOM_RIGHT, and similar constants.
+
+        Returns:
+            A list of tile ids along the requested edge
+
+        """
+        if not quadrant_description in [self.TOP_LEFT, self.TOP_RIGHT, self.BOTTOM_LEFT, self.BOTTOM_RIGHT]:
+            self.warn("Passed invalid quadrant_description '{}'. See the documentation for valid inputs for get_edge_tile_ids.".format(quadrant_description))
+            return
+        return [TILE_IDS[x * self.ARENA_SIZE + y] for x, y in EDGES[quadrant_description]]
+
+    def add_unit(self, unit_type, location, player_index=0, num=1):
         """Add a single GameUnit to the map at the given location.
 
         Args:
             unit_type: The type of the new unit. Use the constants provided in algo_strategy.
             location: A list of two integers representing the [x,y] coordinate of the new unit
             player_index: The index corresponding to the player controlling the new unit, 0 for you 1 for the enemy
+            num: The number of units to add if the unit is mobile. Structures can't stack, so only one is ever added.
 
         This function does not affect your turn and only changes the data stored in GameMap. The intended use of this function
         is to allow you to create arbitrary gamestates. Using this function on the game_map provided with game_state will 
@@ -170,8 +602,12 @@ class GameMap:
         new_unit = GameUnit(unit_type, self.config, player_index, None, location[0], location[1])
         if not new_unit.stationary:
             self.__map[x][y].append(new_unit)
+            if num > 1:
+                #Copies share the parsed config values instead of reading them again
+                self.__map[x][y].extend([copy.copy(new_unit) for _ in range(num - 1)])
         else:
             self.__map[x][y] = [new_unit]
+        self._update_location(x, y)
 
     def remove_unit(self, location):
         """Remove all units on the map in the given location.
@@ -187,6 +623,7 @@ class GameMap:
         
         x, y = location
         self.__map[x][y] = []
+        self._update_location(x, y)
 
     def get_locations_in_range(self, location, radius):
         """Gets locations in a circular area around a location
@@ -201,10 +638,16 @@ class GameMap:
         """
         if radius < 0 or radius > self.ARENA_SIZE:
             self.warn("Radius {} was passed to get_locations_in_range. Expected integer between 0 and {}".format(radius, self.ARENA_SIZE))
+
+        x, y = location
+        if 0 <= x < self.ARENA_SIZE and 0 <= y < self.ARENA_SIZE and x == int(x) and y == int(y):
+            tile_id = TILE_IDS[int(x) * self.ARENA_SIZE + int(y)]
+            if tile_id >= 0:
+                return [list(TILE_LOCATIONS[new_tile_id]) for new_tile_id in self._get_range_tile_ids(tile_id, radius)]
+        #Centers off the arena or between locations are searched directly
         if not self.in_arena_bounds(location):
             self._invalid_coordinates(location)
 
-        x, y = location
         locations = []
         search_radius = math.ceil(radius)
         getHitRadius = self.config["unitInformation"][0]['getHitRadius']
@@ -216,6 +659,61 @@ class GameMap:
                     locations.append(new_location)
         return locations
 
+    def get_tile_ids_in_range(self, tile_id, radius):
+        """Gets the tile ids in a circular area around a tile, in the same order as get_locations_in_range
+
+        Args:
+            tile_id: The tile id of the center of our search area
+            radius: The radius of our search area
+
+        Returns:
+            The tile ids that are within our search area
+
+        """
+        if radius < 0 or radius > self.ARENA_SIZE:
+            self.warn("Radius {} was passed to get_tile_ids_in_range. Expected integer between 0 and {}".format(radius, self.ARENA_SIZE))
+        if not 0 <= tile_id < TILE_COUNT:
+            self._invalid_tile_id(tile_id)
+            return []
+        return list(self._get_range_tile_ids(tile_id, radius))
+
+    def _get_range_tile_ids(self, tile_id, radius):
+        """Gets the cached tuple of tile ids within radius of a valid tile id, clipping its radius' offsets to the arena
+        """
+        key = (radius, tile_id)
+        tile_ids = self.__range_tile_ids.get(key)
+        if tile_ids is None:
+            offsets = self.__range_offsets.get(radius)
+            if offsets is None:
+                offsets = _build_range_offsets(radius, self.__hit_radius)
+                self.__range_offsets[radius] = offsets
+            x, y = TILE_LOCATIONS[tile_id]
+            tile_ids = []
+            for dx, dy in offsets:
+                new_x = x + dx
+                new_y = y + dy
+                if 0 <= new_x < self.ARENA_SIZE and 0 <= new_y < self.ARENA_SIZE and TILE_IDS[new_x * self.ARENA_SIZE + new_y] >= 0:
+                    tile_ids.append(TILE_IDS[new_x * self.ARENA_SIZE + new_y])
+            tile_ids = tuple(tile_ids)
+            self.__range_tile_ids[key] = tile_ids
+        return tile_ids
+
+    def _get_range_rings(self, tile_id, radius):
+        """Gets the tile ids within radius of a valid tile id grouped into rings of equal squared distance.
+        Rings are ordered from the nearest out, and each keeps the order of get_locations_in_range.
+        """
+        key = (radius, tile_id)
+        rings = self.__range_rings.get(key)
+        if rings is None:
+            x, y = TILE_LOCATIONS[tile_id]
+            tiles_by_distance = {}
+            for new_tile_id in self._get_range_tile_ids(tile_id, radius):
+                new_x, new_y = TILE_LOCATIONS[new_tile_id]
+                tiles_by_distance.setdefault((new_x - x)**2 + (new_y - y)**2, []).append(new_tile_id)
+            rings = tuple(tuple(tiles_by_distance[distance]) for distance in sorted(tiles_by_distance))
+            self.__range_rings[key] = rings
+        return rings
+
     def distance_between_locations(self, location_1, location_2):
         """Euclidean distance
 
@@ -1,11 +1,12 @@
 import math
 import json
 import sys
+from collections import OrderedDict
 
 from .navigation import ShortestPathFinder
-from .util import send_command, debug_write
+from .util import send_command, debug_write, parse_json
 from .unit import GameUnit
-from .game_map import GameMap
+from .game_map import GameMap, TILE_IDS, TILE_LOCATIONS, TILE_COUNT
 
 def is_stationary(unit_type):
     """
@@ -44,15 +45,20 @@ class GameState:
         * my_time (int): The time you took to submit your previous turn
         * enemy_health (int): Your opponents current remaining health
         * enemy_time (int): Your opponents current remaining time
+        * path_cache_size (int): How many paths find_path_to_edge remembers. Set to 0 to disable the cache.
+        * path_cache_hits (int): The number of path queries answered from the cache
+        * path_cache_misses (int): The number of path queries that had to run the pathfinder
 
     """
 
-    def __init__(self, config, serialized_string):
+    def __init__(self, config, serialized_string, lazy=False):
         """ Setup a turns variables using arguments passed
 
         Args:
             * config (JSON): A json object containing information about the game
-            * serialized_string (string): A string containing information about the game state at the start of this turn
+            * serialized_string (string): A string containing information about the game state at the start of this turn, or the already decoded dict
+            * lazy (bool): If true, only the turn number, health and resources are read up front.
+              Units are placed on the game map the first time game_map is used.
 
         """
         self.serialized_string = serialized_string
@@ -89,21 +95,45 @@ class GameState:
         MP = self.MP
         SP = self.SP
 
-        self.game_map = GameMap(self.config)
+        self.__game_map = None
+        self.__unparsed_units = None
         self._shortest_path_finder = ShortestPathFinder()
         self._build_stack = []
         self._deploy_stack = []
+        self.path_cache_size = 256
+        self.path_cache_hits = 0
+        self.path_cache_misses = 0
+        self._path_cache = OrderedDict()
+        self._path_tables = {}
         self._player_resources = [
                 {'SP': 0, 'MP': 0},  # player 0, which is you
                 {'SP': 0, 'MP': 0}]  # player 1, which is the opponent
-        self.__parse_state(serialized_string)
-
-    def __parse_state(self, state_line):
+        self.__parse_state(serialized_string, lazy)
+
+    @property
+    def game_map(self):
+        """The GameMap for this turn, with the units of both players placed on it when it is first used in lazy mode"""
+        if self.__game_map is None:
+            self.__game_map = GameMap(self.config)
+            self.__game_map.enable_warnings = self.enable_warnings
+            if self.__unparsed_units is not None:
+                p1units, p2units = self.__unparsed_units
+                self.__unparsed_units = None
+                self.__create_parsed_units(p1units, 0)
+                self.__create_parsed_units(p2units, 1)
+        return self.__game_map
+
+    @game_map.setter
+    def game_map(self, game_map):
+        self.__game_map = game_map
+        self.__unparsed_units = None
+
+    def __parse_state(self, state_line, lazy=False):
         """
         Fills in map based on the serialized game state so that self.game_map[x,y] is a list of GameUnits at that location.
-        state_line is the game state as a json string.
+        state_line is the game state as a json string, or the dict decoded from it.
         """
-        state = json.loads(state_line)
+        state = state_line if isinstance(state_line, dict) else parse_json(state_line)
 
         turn_info = state["turnInfo"]
         self.turn_number = int(turn_info[1])
@@ -123,8 +153,10 @@ class GameState:
         p1units = state["p1Units"]
         p2units = state["p2Units"]
 
-        self.__create_parsed_units(p1units, 0)
-        self.__create_parsed_units(p2units, 1)
+        self.__unparsed_units = (p1units, p2units)
+        if not lazy:
+            #Using the map places the units on it
+            self.game_map
 
     def __create_parsed_units(self, units, player_number):
         """
@@ -145,9 +177,11 @@ class GameState:
                 elif unit_type == UPGRADE:
                     if self.contains_stationary_unit([x,y]):
                         self.game_map[x,y][0].upgrade()
+                        self.game_map._update_location(x, y)
                 else:
                     unit = GameUnit(unit_type, self.config, player_number, hp, x, y)
                     self.game_map[x,y].append(unit)
+                    self.game_map._update_location(x, y)
 
     def __resource_required(self, unit_type):
         return self.SP if is_stationary(unit_type) else self.MP
@@ -333,7 +367,7 @@ class GameState:
         stationary = is_stationary(unit_type)
         blocked = self.contains_stationary_unit(location) or (stationary and len(self.game_map[location[0],location[1]]) > 0)
         correct_territory = location[1] < self.HALF_ARENA
-        on_edge = location in (self.game_map.get_edge_locations(self.game_map.BOTTOM_LEFT) + self.game_map.get_edge_locations(self.game_map.BOTTOM_RIGHT))
+        on_edge = self.game_map.is_on_edge(location, self.game_map.BOTTOM_LEFT) or self.game_map.is_on_edge(location, self.game_map.BOTTOM_RIGHT)
 
         if self.enable_warnings:
             fail_reason = ""
@@ -375,6 +409,9 @@ class GameState:
             locations = [locations]
         spawned_units = 0
         for location in locations:
+            if not is_stationary(unit_type):
+                spawned_units += self.__spawn_mobile_units(unit_type, location, num)
+                continue
             for i in range(num):
                 if self.can_spawn(unit_type, location, 1):
                     x, y = map(int, location)
@@ -391,6 +428,25 @@ class GameState:
                     break
         return spawned_units
 
+    def __spawn_mobile_units(self, unit_type, location, num):
+        """
+        Spawns as many of num mobile units at a location as we can afford, validating the location once.
+        Mobile units don't block each other, so only resources limit how many can be spawned.
+        """
+        if not self.can_spawn(unit_type, location, 1):
+            return 0
+        count = min(num, self.number_affordable(unit_type))
+        x, y = map(int, location)
+        costs = self.type_cost(unit_type)
+        self.__set_resource(SP, 0 - costs[SP] * count)
+        self.__set_resource(MP, 0 - costs[MP] * count)
+        self.game_map.add_unit(unit_type, location, 0, count)
+        self._deploy_stack.extend([(unit_type, x, y)] * count)
+        if count < num:
+            #Warn about the first unit we couldn't afford, as spawning them one at a time would
+            self.can_spawn(unit_type, location, 1)
+        return count
+
     def attempt_remove(self, locations):
         """Attempts to remove existing friendly structures in the given locations.
 
@@ -446,6 +502,7 @@ class GameState:
                         self.__set_resource(SP, 0 - costs[SP])
                         self.__set_resource(MP, 0 - costs[MP])
                         existing_unit.upgrade()
+                        self.game_map._update_location(x, y)
                         self._build_stack.append((UPGRADE, x, y))
                         spawned_units += 1
             else:
@@ -495,8 +552,137 @@ class GameState:
         if target_edge is None:
             target_edge = self.get_target_edge(start_location)
 
+        key = self.__path_cache_key(start_location, target_edge)
+        path = self.__get_cached_path(key)
+        if path is not None:
+            return path
+        end_points = self.game_map.get_edge_locations(target_edge)
+        path = self._shortest_path_finder.navigate_multiple_endpoints(start_location, end_points, self)
+        self.__cache_path(key, path)
+        return path
+
+    def find_path_under_destruction(self, start_location, unblock_events, target_edge=None):
+        """Gets the path a unit would take if structures along the way are destroyed while it walks,
+        for example by demolishers opening a lane ahead of it.
+
+        Args:
+            start_location: The location of a hypothetical unit
+            unblock_events: A list of (step, location) pairs ordered by step. The structure at location is destroyed once the unit has taken step moves.
+            target_edge: The edge the unit wants to reach. game_map.TOP_LEFT, game_map.BOTTOM_RIGHT, etc. Induced from start_location if None.
+
+        Returns:
+            A list of locations corresponding to the path the unit would walk, changing course as structures are destroyed
+
+        """
+        if self.contains_stationary_unit(start_location):
+            self.warn("Attempted to perform pathing from blocked starting location {}".format(start_location))
+            return
+
+        if target_edge is None:
+            target_edge = self.get_target_edge(start_location)
         end_points = self.game_map.get_edge_locations(target_edge)
-        return self._shortest_path_finder.navigate_multiple_endpoints(start_location, end_points, self)
+        return self._shortest_path_finder.navigate_with_unblocking(start_location, end_points, self, unblock_events)
+
+    def find_paths_to_edge(self, start_locations, target_edge=None):
+        """Gets the paths units at several locations would take.
+        Equivalent to calling find_path_to_edge for each location, but locations that
+        share a target edge are pathed together and share their search work.
+
+        Args:
+            start_locations: A list of locations of hypothetical units
+            target_edge: The edge the units want to reach. game_map.TOP_LEFT, game_map.BOTTOM_RIGHT, etc. Induced from each start location if None.
+
+        Returns:
+            A list with the path for each start location, in order. The entry is None if the start location is blocked.
+
+        """
+        paths = [None] * len(start_locations)
+        starts_by_edge = {}
+        for i, start_location in enumerate(start_locations):
+            if self.contains_stationary_unit(start_location):
+                self.warn("Attempted to perform pathing from blocked starting location {}".format(start_location))
+                continue
+            edge = self.get_target_edge(start_location) if target_edge is None else target_edge
+            paths[i] = self.__get_cached_path(self.__path_cache_key(start_location, edge))
+            if paths[i] is None:
+                starts_by_edge.setdefault(edge, []).append(i)
+
+        for edge, indices in starts_by_edge.items():
+            end_points = self.game_map.get_edge_locations(edge)
+            edge_paths = self._shortest_path_finder.navigate_multiple_starts([start_locations[i] for i in indices], end_points, self)
+            for i, path in zip(indices, edge_paths):
+                self.__cache_path(self.__path_cache_key(start_locations[i], edge), path)
+                paths[i] = path
+        return paths
+
+    def spawn_path_table(self):
+        """Gets the paths of units spawned on every location of your edges, computed in one pass
+
+        Returns:
+            A PathTable with an entry for every location on game_map.BOTTOM_LEFT and game_map.BOTTOM_RIGHT.
+            table[location] gives the entry's path, length, self_destructs flag and target_edge.
+            The path is None for locations blocked by a structure. The table is computed once and
+            reused until the blocked locations change, so it should not be modified.
+
+        """
+        return self.__get_path_table([self.game_map.BOTTOM_LEFT, self.game_map.BOTTOM_RIGHT])
+
+    def enemy_path_table(self):
+        """Gets the paths of enemy units spawned on every location of their edges, computed in one pass
+
+        Returns:
+            A PathTable with an entry for every location on game_map.TOP_LEFT and game_map.TOP_RIGHT,
+            in the same format as spawn_path_table. Useful to predict where enemy mobile units will walk
+            when placing defenses. It is reused until the blocked locations change, so it should not be modified.
+
+        """
+        return self.__get_path_table([self.game_map.TOP_LEFT, self.game_map.TOP_RIGHT])
+
+    def __get_path_table(self, start_edges):
+        """
+        Returns the cached PathTable for units starting on the given edges, building it if the blocked locations changed
+        """
+        key = (tuple(start_edges), self.game_map.get_blocked_hash())
+        table = self._path_tables.get(key)
+        if table is None:
+            start_groups = []
+            for edge in start_edges:
+                start_points = self.game_map.get_edge_locations(edge)
+                target_edge = self.get_target_edge(start_points[0])
+                start_groups.append((start_points, self.game_map.get_edge_locations(target_edge), target_edge))
+            table = self._shortest_path_finder.navigate_path_table(start_groups, self)
+            #Tables for older layouts won't be asked for again
+            self._path_tables = {k: t for k, t in self._path_tables.items() if k[1] == key[1]}
+            self._path_tables[key] = table
+        return table
+
+    def __path_cache_key(self, start_location, target_edge):
+        """
+        Paths only depend on where they start, where they go and which locations are blocked
+        """
+        return (int(start_location[0]), int(start_location[1]), target_edge, self.game_map.get_blocked_hash())
+
+    def __get_cached_path(self, key):
+        """
+        Returns a fresh copy of a cached path, or None on a cache miss
+        """
+        path = self._path_cache.get(key)
+        if path is None:
+            self.path_cache_misses += 1
+            return None
+        self.path_cache_hits += 1
+        self._path_cache.move_to_end(key)
+        return [list(location) for location in path]
+
+    def __cache_path(self, key, path):
+        """
+        Stores a path, evicting the least recently used paths once the cache is full
+        """
+        if self.path_cache_size <= 0 or path is None:
+            return
+        self._path_cache[key] = tuple(tuple(location) for location in path)
+        while len(self._path_cache) > self.path_cache_size:
+            self._path_cache.popitem(last=False)
 
     def contains_stationary_unit(self, location):
         """Check if a location is blocked, return structures unit if it is
@@ -517,6 +703,24 @@ class GameState:
                 return unit
         return False
 
+    def contains_stationary_unit_at_tile(self, tile_id):
+        """Check if a tile is blocked, return structures unit if it is
+
+        Args:
+            tile_id: The tile id to check, see GameMap.get_tile_id
+
+        Returns:
+            A structures unit if there is a stationary unit at the tile, False otherwise
+
+        """
+        units = self.game_map.get_units_at_tile(tile_id)
+        if units is None:
+            return False
+        for unit in units:
+            if unit.stationary:
+                return unit
+        return False
+
     def warn(self, message):
         """ Used internally by game_state to print warnings
         """
@@ -533,7 +737,8 @@ class GameState:
         """
 
         self.enable_warnings = not suppress
-        self.game_map.enable_warnings = not suppress
+        if self.__game_map is not None:
+            self.__game_map.enable_warnings = not suppress
 
     def get_target(self, attacking_unit):
         """Returns target of given unit based on current map of the game board. 
@@ -555,6 +760,10 @@ class GameState:
             return
 
         attacker_location = [attacking_unit.x, attacking_unit.y]
+        tile_id = self.__get_tile_id(attacker_location)
+        if tile_id is not None:
+            return self.__get_target_by_rings(attacking_unit, tile_id)
+
         possible_locations = self.game_map.get_locations_in_range(attacker_location, attacking_unit.attackRange)
         target = None
         target_stationary = True
@@ -614,15 +823,56 @@ class GameState:
                     target_x_distance = unit_x_distance
         return target
 
+    def __get_target_by_rings(self, attacking_unit, tile_id):
+        """
+        Finds the same target as get_target by walking rings of equal distance out from the attacker.
+        Within a ring only health, height and distance from the center are left to compare, and
+        the nearest ring with a target wins, so we can stop as soon as no better target can turn up.
+        """
+        player_index = attacking_unit.player_index
+        attacks_structures = not attacking_unit.damage_f == 0
+        attacks_mobile_units = not attacking_unit.damage_i == 0
+        #Mobile units are preferred at any distance, so a structure is only final if no enemy mobile units are left
+        mobile_units_remaining = attacks_mobile_units
+        if attacks_mobile_units and (player_index == 0 or player_index == 1):
+            mobile_units_remaining = any(self.game_map.get_unit_count(unit_type, 1 - player_index) > 0 for unit_type in [SCOUT, DEMOLISHER, INTERCEPTOR])
+        y_direction = 1 if player_index == 0 else -1
+
+        target = None
+        for ring in self.game_map._get_range_rings(tile_id, attacking_unit.attackRange):
+            ring_target = None
+            ring_key = None
+            for ring_tile_id in ring:
+                for unit in self.game_map.get_units_at_tile(ring_tile_id):
+                    if unit.player_index == player_index:
+                        continue
+                    unit_is_stationary = is_stationary(unit.unit_type)
+                    if (unit_is_stationary and (not attacks_structures or target is not None)) or (not unit_is_stationary and not attacks_mobile_units):
+                        continue
+                    key = (unit.stationary, unit.health, y_direction * unit.y, -abs(self.HALF_ARENA - 0.5 - unit.x))
+                    if ring_key is None or key < ring_key:
+                        ring_target = unit
+                        ring_key = key
+            if ring_target is None:
+                continue
+            if not ring_target.stationary:
+                return ring_target
+            target = ring_target
+            if not mobile_units_remaining:
+                return target
+        return target
+
     def get_attackers(self, location, player_index):
-        """Gets the stationary units threatening a given location
+        """Gets the units threatening a given location
 
         Args:
             location: The location of a hypothetical defender
             player_index: The index corresponding to the defending player, 0 for you 1 for the enemy
 
         Returns:
-            A list of units that would attack a unit controlled by the given player at the given location
+            A list of units that would attack a unit controlled by the given player at the given location.
+            The answer comes from coverage the game map keeps as units change, so after editing
+            game_map[x, y] or its units in place call game_map.refresh_location(location) first.
 
         """
 
@@ -631,6 +881,11 @@ class GameState:
         if not self.game_map.in_arena_bounds(location):
             self.warn("Location {} is not in the arena bounds.".format(location))
 
+        #Answer from the coverage map kept by the game map when we can
+        tile_id = self.__get_tile_id(location)
+        if tile_id is not None and (player_index == 0 or player_index == 1):
+            return self.game_map._get_attackers_at_tile(tile_id, player_index)
+
         attackers = []
         """
         Get locations in the range of TURRET units
@@ -645,3 +900,85 @@ class GameState:
                 if unit.damage_i + unit.damage_f > 0 and unit.player_index != player_index and self.game_map.distance_between_locations(location, location_unit) <= unit.attackRange:
                     attackers.append(unit)
         return attackers
+
+    def get_attacker_damage(self, location, player_index):
+        """Gets the damage per frame a mobile unit at a given location would take
+
+        Args:
+            location: The location of a hypothetical mobile unit
+            player_index: The index corresponding to the player controlling the unit, 0 for you 1 for the enemy
+
+        Returns:
+            The total damage the units returned by get_attackers deal to mobile units each frame.
+            Like get_attackers, it needs game_map.refresh_location after units are edited in place.
+
+        """
+        tile_id = self.__get_tile_id(location)
+        if tile_id is None or not (player_index == 0 or player_index == 1):
+            return sum(unit.damage_i for unit in self.get_attackers(location, player_index))
+        return self.game_map._get_damage_at_tile(tile_id, player_index)
+
+    def path_damage(self, path, unit_type, count=1, player_index=0):
+        """Estimates the damage a group of mobile units would take walking along a path
+
+        A unit spends 1 / speed frames on each location of the path, taking the damage returned by
+        get_attacker_damage every frame, which accounts for upgraded turrets. Attackers are assumed to
+        focus one unit of the group until it dies. Shielding is not taken into account.
+
+        Args:
+            path: A list of locations, such as the path returned by find_path_to_edge
+            unit_type: The type of the mobile units walking the path
+            count: The number of units in the group
+            player_index: The index corresponding to the player controlling the units, 0 for you 1 for the enemy
+
+        Returns:
+            A tuple of the total damage the group would take and the number of units expected to survive
+
+        """
+        if unit_type not in ALL_UNITS or is_stationary(unit_type):
+            self._invalid_unit(unit_type)
+            return
+        if path is None:
+            self.warn("Passed no path to path_damage, the start location may be blocked")
+            return
+
+        unit = GameUnit(unit_type, self.config, player_index)
+        damage_per_frame = 0
+        for location in path:
+            damage_per_frame += self.get_attacker_damage(location, player_index)
+        damage = damage_per_frame / unit.speed if unit.speed > 0 else 0
+        if unit.max_health > 0:
+            survivors = count - min(count, math.floor(damage / unit.max_health))
+        else:
+            survivors = count
+        return damage, survivors
+
+    def __get_tile_id(self, location):
+        """
+        Gets the tile id of a location with integer coordinates inside the arena, or None without warning
+        """
+        x, y = location
+        if 0 <= x < self.ARENA_SIZE and 0 <= y < self.ARENA_SIZE and x == int(x) and y == int(y):
+            tile_id = TILE_IDS[int(x) * self.ARENA_SIZE + int(y)]
+            if tile_id >= 0:
+                return tile_id
+        return None
+
+    def get_attackers_at_tile(self, tile_id, player_index):
+        """Gets the stationary units threatening a given tile, in the same order as get_attackers
+
+        Args:
+            tile_id: The tile id of a hypothetical defender, see GameMap.get_tile_id
+            player_index: The index corresponding to the defending player, 0 for you 1 for the enemy
+
+        Returns:
+            A list of units that would attack a unit controlled by the given player at the given tile
+
+        """
+        if not 0 <= tile_id < TILE_COUNT:
+            self.game_map._invalid_tile_id(tile_id)
+            return []
+        if not player_index == 0 and not player_index == 1:
+            #get_attackers warns about the player index
+            return self.get_attackers(list(TILE_LOCATIONS[tile_id]), player_index)
+        return self.game_map._get_attackers_at_tile(tile_id, player_index)
@@ -1,24 +1,50 @@
 import heapq
 import math
 import sys
-import queue
+from array import array
+from collections import deque
 from .util import debug_write
+from .game_map import ARENA_MASK, ARENA_MASK_ARRAY
 
-class Node:
-    """A path-finding node
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-    Attributes :
-        * visited_idealness (bool): Have we visited this node during the idealness search step?
-        * visited_validate (bool): Have we visited this node during the validation step?
-        * blocked (bool): Is there a structures at this node's location
-        * pathlength: The distance between this node and the target location
+ARENA_SIZE = 28
+#Every per-tile buffer is a flat array indexed by x * ARENA_SIZE + y
+_NO_PATHLENGTH = array('i', [-1]) * (ARENA_SIZE * ARENA_SIZE)
+#Above this many changed tiles it is cheaper to recompute cached distance fields than to repair them
+_MAX_REPAIRED_TILES = 8
+
+#Implementations of the breadth first searches, see ShortestPathFinder.backend
+PYTHON_BACKEND = "python"
+NUMPY_BACKEND = "numpy"
+
+def _build_tile_tables():
+    """Precomputes the geometry of the diamond shaped arena.
+
+    Returns:
+        * The [x, y] coordinates of every tile index, as tuples
+        * The indices of every tile inside the arena
+        * For every tile index, the indices of its in-arena neighbors in the order units consider them: up, down, right, left
 
     """
-    def __init__(self):
-        self.visited_idealness = False
-        self.visited_validate = False
-        self.blocked = False
-        self.pathlength = -1
+    def in_arena_bounds(x, y):
+        return 0 <= x < ARENA_SIZE and 0 <= y < ARENA_SIZE and ARENA_MASK[x][y] == 1
+
+    locations = tuple((x, y) for x in range(ARENA_SIZE) for y in range(ARENA_SIZE))
+    arena_indices = tuple(x * ARENA_SIZE + y for x, y in locations if in_arena_bounds(x, y))
+    neighbors = []
+    for x, y in locations:
+        if not in_arena_bounds(x, y):
+            neighbors.append(())
+            continue
+        adjacent = [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]
+        neighbors.append(tuple(nx * ARENA_SIZE + ny for nx, ny in adjacent if in_arena_bounds(nx, ny)))
+    return locations, arena_indices, tuple(neighbors)
+
+_LOCATIONS, _ARENA_INDICES, _NEIGHBORS = _build_tile_tables()
 
 """
 This class helps with pathfinding. We guarantee the results will
@@ -33,13 +59,31 @@ class ShortestPathFinder:
         * VERTICAL (int): A constant representing a vertical movement
 
         * game_state (:obj: GameState): The current gamestate
-        * game_map (:obj: GameMap): The current gamemap
+        * backend (str): PYTHON_BACKEND, or NUMPY_BACKEND to run the breadth first searches as NumPy wavefronts.
+          The NumPy backend amortises Python overhead when running very many searches, for example when analysing replays.
+
+    The map is stored in preallocated flat buffers indexed by x * ARENA_SIZE + y.
+    Everything derived from the blocked locations is cached until they change:
+    the connected pockets of pathable space, the most ideal tile of each pocket for
+    each set of end points, and the distance fields computed by the validation step.
+    When only a few tiles change, cached edge distance fields are repaired in place.
 
     """
-    def __init__(self):
+    def __init__(self, backend=PYTHON_BACKEND):
         self.HORIZONTAL = 1
         self.VERTICAL = 2
         self.initialized = False
+        if backend == NUMPY_BACKEND and np is None:
+            debug_write("NumPy is not installed, falling back to the {} pathfinding backend".format(PYTHON_BACKEND))
+            backend = PYTHON_BACKEND
+        self.backend = backend
+        self._blocked = bytearray(ARENA_SIZE * ARENA_SIZE)
+        self._pathlength = array('i', _NO_PATHLENGTH)
+        self._component = array('i', _NO_PATHLENGTH)
+        self._component_tiles = None
+        self._most_ideal_tiles = {}
+        self._edge_pathlengths = {}
+        self._self_destruct_pathlengths = {}
 
     def initialize_map(self, game_state):
         """Initializes the map
@@ -50,7 +94,169 @@ class ShortestPathFinder:
         #Initialize map 
         self.initialized = True
         self.game_state = game_state
-        self.game_map = [[Node() for x in range(self.game_state.ARENA_SIZE)] for y in range(self.game_state.ARENA_SIZE)]
+        #Blocked tiles are maintained incrementally by the game map, so we only need to copy them
+        blocked = game_state.game_map.get_blocked_mask()
+        if self._blocked != blocked:
+            changed = self._get_changed_indices(blocked)
+            if len(changed) > _MAX_REPAIRED_TILES:
+                self._blocked[:] = blocked
+                self._clear_caches()
+            else:
+                for index in changed:
+                    self._set_tile_blocked(index, blocked[index])
+
+    def _get_changed_indices(self, blocked):
+        """Gets the indices where a blocked mask differs from ours, stopping early once there are too many to repair
+        """
+        #Every byte of a mask is 0 or 1, so each differing tile sets exactly bit 8 * index
+        difference = int.from_bytes(self._blocked, 'little') ^ int.from_bytes(blocked, 'little')
+        changed = []
+        while difference and len(changed) <= _MAX_REPAIRED_TILES:
+            lowest_bit = difference & -difference
+            changed.append((lowest_bit.bit_length() - 1) // 8)
+            difference ^= lowest_bit
+        return changed
+
+    def _clear_caches(self):
+        """Drops everything derived from the blocked locations
+        """
+        self._component_tiles = None
+        self._most_ideal_tiles.clear()
+        self._edge_pathlengths.clear()
+        self._self_destruct_pathlengths.clear()
+
+    def set_blocked(self, location, blocked=True):
+        """Blocks or unblocks a single location in the pathfinder's copy of the map.
+        Intended for 'what if' evaluation together with find_path, for example to see how
+        a path changes if a wall is placed. Cached edge distance fields are repaired in place.
+        initialize_map must have been called first, and the change is undone by the next navigate call.
+
+        Args:
+            * location: The location to change
+            * blocked: True to place a hypothetical structure there, False to remove it
+
+        """
+        if not self.game_state.game_map.in_arena_bounds(location):
+            self.game_state.game_map._invalid_coordinates(location)
+            return
+        self._set_tile_blocked(location[0] * ARENA_SIZE + location[1], 1 if blocked else 0)
+
+    def find_path(self, start_point, end_points):
+        """Finds the path a unit would take over the pathfinder's current copy of the map,
+        including any changes made with set_blocked. initialize_map must have been called first.
+
+        Args:
+            * start_point: The starting location of the unit
+            * end_points: The end points of the unit, should be a list of edge locations
+
+        Returns:
+            The path a unit at start_point would take when trying to reach end_points, or None if start_point is blocked
+
+        """
+        if self._blocked[start_point[0] * ARENA_SIZE + start_point[1]]:
+            return
+        #Do pathfinding
+        ideal_tile = self._idealness_search(start_point, end_points)
+        self._validate(ideal_tile, end_points)
+        return self._get_path(start_point, end_points)
+
+    def _set_tile_blocked(self, index, blocked):
+        """Flips a single tile of our blocked buffer and repairs the cached edge distance fields
+        """
+        if self._blocked[index] == blocked:
+            return
+        self._blocked[index] = blocked
+        #Pockets and their self destruct tiles can change arbitrarily, so they are recomputed when next needed
+        self._component_tiles = None
+        self._most_ideal_tiles.clear()
+        self._self_destruct_pathlengths.clear()
+        for pathlength in self._edge_pathlengths.values():
+            if blocked:
+                self._repair_after_blocking(pathlength, index)
+            else:
+                self._repair_after_unblocking(pathlength, index)
+
+    def _repair_after_blocking(self, pathlength, blocked_index):
+        """Updates a distance field after a tile becomes blocked.
+        Only the tiles whose every shortest route ran through the blocked tile are recomputed.
+        End points always keep a pathlength of 0, as they do after _validate.
+        """
+        blocked = self._blocked
+        old_pathlength = pathlength[blocked_index]
+        if old_pathlength == -1:
+            #Nothing was routed through an unreachable tile
+            return
+        if old_pathlength > 0:
+            pathlength[blocked_index] = -1
+
+        #Find the tiles that lost every neighbor one step closer to the target.
+        #The queue holds tiles in order of pathlength, so all candidate supports of a tile are decided before it.
+        affected = set()
+        checked = set()
+        child_pathlength = old_pathlength + 1
+        current = deque([index for index in _NEIGHBORS[blocked_index] if not blocked[index] and pathlength[index] == child_pathlength])
+        while current:
+            index = current.popleft()
+            if index in checked:
+                continue
+            checked.add(index)
+            parent_pathlength = pathlength[index] - 1
+            supported = False
+            for neighbor in _NEIGHBORS[index]:
+                if not blocked[neighbor] and not neighbor in affected and pathlength[neighbor] == parent_pathlength:
+                    supported = True
+                    break
+            if supported:
+                continue
+            affected.add(index)
+            for neighbor in _NEIGHBORS[index]:
+                if not blocked[neighbor] and pathlength[neighbor] == parent_pathlength + 2:
+                    current.append(neighbor)
+
+        #Recompute the affected tiles from their unaffected neighbors
+        for index in affected:
+            pathlength[index] = -1
+        frontier = []
+        for index in affected:
+            best = -1
+            for neighbor in _NEIGHBORS[index]:
+                if not blocked[neighbor] and pathlength[neighbor] >= 0 and (best == -1 or pathlength[neighbor] + 1 < best):
+                    best = pathlength[neighbor] + 1
+            if best >= 0:
+                heapq.heappush(frontier, (best, index))
+        while frontier:
+            distance, index = heapq.heappop(frontier)
+            if not pathlength[index] == -1:
+                continue
+            pathlength[index] = distance
+            for neighbor in _NEIGHBORS[index]:
+                if neighbor in affected and pathlength[neighbor] == -1:
+                    heapq.heappush(frontier, (distance + 1, neighbor))
+
+    def _repair_after_unblocking(self, pathlength, unblocked_index):
+        """Updates a distance field after a tile becomes unblocked, propagating any shorter routes through it
+        """
+        blocked = self._blocked
+        #End points keep a pathlength of 0 while blocked, any other blocked tile is -1
+        if not pathlength[unblocked_index] == 0:
+            best = -1
+            for neighbor in _NEIGHBORS[unblocked_index]:
+                if not blocked[neighbor] and pathlength[neighbor] >= 0 and (best == -1 or pathlength[neighbor] + 1 < best):
+                    best = pathlength[neighbor] + 1
+            pathlength[unblocked_index] = best
+            if best == -1:
+                return
+
+        current = deque([unblocked_index])
+        while current:
+            index = current.popleft()
+            next_pathlength = pathlength[index] + 1
+            for neighbor in _NEIGHBORS[index]:
+                if blocked[neighbor]:
+                    continue
+                if pathlength[neighbor] == -1 or pathlength[neighbor] > next_pathlength:
+                    pathlength[neighbor] = next_pathlength
+                    current.append(neighbor)
 
     def navigate_multiple_endpoints(self, start_point, end_points, game_state):
         """Finds the path a unit would take to reach a set of endpoints
@@ -65,55 +271,198 @@ class ShortestPathFinder:
             Note that this path can change if a tower is destroyed during pathing, or if you or your enemy places structures.
 
         """
-        if game_state.contains_stationary_unit(start_point):
+        return self.navigate_multiple_starts([start_point], end_points, game_state)[0]
+
+    def navigate_multiple_starts(self, start_points, end_points, game_state):
+        """Finds the paths units at several starting locations would take to reach the same set of endpoints
+
+        Args:
+            * start_points: The starting locations of the units
+            * end_points: The end points of the units, should be a list of edge locations
+            * game_state: The current game state
+
+        Returns:
+            A list with the path for each start point, in order, as navigate_multiple_endpoints would return it.
+            Start points that share a pocket of pathable space share one idealness search and validation step.
+
+        """
+        #Initialize map and fill in walls
+        self.initialize_map(game_state)
+        paths = []
+        for start_point in start_points:
+            #find_path returns None for blocked start points, using the same blocked mask as the search
+            paths.append(self.find_path(start_point, end_points))
+        return paths
+
+    def navigate_with_unblocking(self, start_point, end_points, game_state, unblock_events):
+        """Finds the path a unit would walk if structures in its way are destroyed while it moves.
+        Whenever a location is unblocked the unit paths again from where it stands, as it does in the game,
+        keeping its previous move direction for tie-breaking. Cached distance fields are repaired after
+        each event rather than recomputed, and every unblocked location is blocked again afterwards.
+
+        Args:
+            * start_point: The starting location of the unit
+            * end_points: The end points of the unit, should be a list of edge locations
+            * game_state: The current game state
+            * unblock_events: A list of (step, location) pairs, ordered by step. The structure at location is
+              destroyed once the unit has taken step moves, before it chooses its next one.
+
+        Returns:
+            The piecewise path the unit would walk, or None if start_point is blocked
+
+        """
+        self.initialize_map(game_state)
+        if self._blocked[start_point[0] * ARENA_SIZE + start_point[1]]:
             return
+        unblocked = []
+        path = [start_point]
+        current = start_point[0] * ARENA_SIZE + start_point[1]
+        move_direction = 0
+        next_event = 0
+        repath = True
+        while True:
+            #Apply the events that happen before this step
+            while next_event < len(unblock_events) and unblock_events[next_event][0] <= len(path) - 1:
+                location = unblock_events[next_event][1]
+                next_event += 1
+                if not game_state.game_map.in_arena_bounds(location):
+                    game_state.game_map._invalid_coordinates(location)
+                    continue
+                index = location[0] * ARENA_SIZE + location[1]
+                if self._blocked[index]:
+                    self._set_tile_blocked(index, 0)
+                    unblocked.append(index)
+                    repath = True
+            if repath:
+                ideal_tile = self._idealness_search(list(_LOCATIONS[current]), end_points)
+                self._validate(ideal_tile, end_points)
+                repath = False
+            if self._pathlength[current] == 0:
+                break
+            next_move = self._choose_next_move(current, move_direction, end_points)
+            if current // ARENA_SIZE == next_move // ARENA_SIZE:
+                move_direction = self.VERTICAL
+            else:
+                move_direction = self.HORIZONTAL
+            path.append(list(_LOCATIONS[next_move]))
+            current = next_move
 
-        #Initialize map 
+        #Put the destroyed structures back so the pathfinder matches the game map again
+        for index in unblocked:
+            self._set_tile_blocked(index, 1)
+        return path
+
+    def navigate_path_table(self, start_groups, game_state):
+        """Finds the paths units at every location of several groups would take, in one pass over the map
+
+        Args:
+            * start_groups: A list of (start_points, end_points, target_edge) tuples, one for each set of start points that share their end points
+            * game_state: The current game state
+
+        Returns:
+            A PathTable with an entry for every start point, in order. Blocked start points get an entry with no path.
+            Groups share the cached pockets and distance fields, so each set of end points is only searched once.
+
+        """
         self.initialize_map(game_state)
-        #Fill in walls
-        for location in self.game_state.game_map:
-            if self.game_state.contains_stationary_unit(location):
-                self.game_map[location[0]][location[1]].blocked = True
-        #Do pathfinding
-        ideal_endpoints = self._idealness_search(start_point, end_points)
-        self._validate(ideal_endpoints, end_points)
-        return self._get_path(start_point, end_points)
+        entries = []
+        for start_points, end_points, target_edge in start_groups:
+            end_point_indices = set(self._get_endpoints_key(end_points))
+            for start_point in start_points:
+                path = self.find_path(start_point, end_points)
+                self_destructs = path is not None and not path[-1][0] * ARENA_SIZE + path[-1][1] in end_point_indices
+                entries.append(PathTableEntry(start_point, target_edge, path, self_destructs))
+        return PathTable(entries)
+
+    def _get_endpoints_key(self, end_points):
+        """Gets a hashable key identifying a set of end points
+        """
+        return tuple([location[0] * ARENA_SIZE + location[1] for location in end_points])
 
     def _idealness_search(self, start, end_points):
         """
         Finds the most ideal tile in our 'pocket' of pathable space. 
-        The edge if it is available, or the best self destruct location otherwise
+        The edge if it is available, or the best self destruct location otherwise.
+        Pockets are labelled once per board, so this is a lookup after the first search.
         """
-        current = queue.Queue()
-        current.put(start)
-        best_idealness = self._get_idealness(start, end_points)
-        self.game_map[start[0]][start[1]].visited_idealness = True
-        most_ideal = start
-
-        while not current.empty():
-            search_location = current.get()
-            for neighbor in self._get_neighbors(search_location):
-                if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
-                    continue
-
-                x, y = neighbor
-                current_idealness = self._get_idealness(neighbor, end_points)
+        #A cached edge distance field that reaches the start means the edge is in our pocket
+        edge_pathlength = self._edge_pathlengths.get(self._get_endpoints_key(end_points))
+        if edge_pathlength is not None and edge_pathlength[start[0] * ARENA_SIZE + start[1]] >= 0:
+            return end_points[0]
+
+        if self._component_tiles is None:
+            self._label_components()
+        component = self._component[start[0] * ARENA_SIZE + start[1]]
+        if component == -1:
+            #Not part of any pocket, the unit can't move
+            return start
+
+        most_ideal = self._get_most_ideal_tiles(end_points)[component]
+        if most_ideal == -1:
+            return end_points[0]
+        return [most_ideal // ARENA_SIZE, most_ideal % ARENA_SIZE]
+
+    def _label_components(self):
+        """Labels every pocket of connected, unblocked tiles with its own component number
+        """
+        if self.backend == NUMPY_BACKEND:
+            self._label_components_numpy()
+            return
 
-                if current_idealness > best_idealness:
-                    best_idealness = current_idealness
-                    most_ideal = neighbor
+        blocked = self._blocked
+        labels = self._component
+        labels[:] = _NO_PATHLENGTH
+        self._component_tiles = []
+        for index in _ARENA_INDICES:
+            if blocked[index] or not labels[index] == -1:
+                continue
 
-                if not self.game_map[x][y].visited_idealness and not self.game_map[x][y].blocked:
-                    self.game_map[x][y].visited_idealness = True
-                    current.put(neighbor)
+            #Flood the pocket containing this tile
+            component = len(self._component_tiles)
+            tiles = [index]
+            labels[index] = component
+            current = deque()
+            current.append(index)
+            while current:
+                for neighbor in _NEIGHBORS[current.popleft()]:
+                    if blocked[neighbor] or not labels[neighbor] == -1:
+                        continue
+                    labels[neighbor] = component
+                    tiles.append(neighbor)
+                    current.append(neighbor)
+            self._component_tiles.append(tiles)
+
+    def _get_most_ideal_tiles(self, end_points):
+        """Gets the most ideal tile of every pocket for a set of end points
 
-        return most_ideal
+        Returns:
+            An array indexed by component number holding the index of the most ideal tile of that pocket,
+            or -1 if the pocket contains one of the end points
 
-    def _get_neighbors(self, location):
-        """Get the locations adjacent to a location
         """
-        x, y = location
-        return [[x, y + 1], [x, y - 1], [x + 1, y], [x - 1, y]]
+        key = self._get_endpoints_key(end_points)
+        most_ideal_tiles = self._most_ideal_tiles.get(key)
+        if most_ideal_tiles is not None:
+            return most_ideal_tiles
+
+        end_indices = set(key)
+        direction = self._get_direction_from_endpoints(end_points)
+        most_ideal_tiles = array('i')
+        for tiles in self._component_tiles:
+            best_idealness = -1
+            most_ideal = -1
+            for index in tiles:
+                if index in end_indices:
+                    most_ideal = -1
+                    break
+                #Every tile that is not an end point has a distinct idealness
+                idealness = self._get_idealness(list(_LOCATIONS[index]), end_points, direction)
+                if idealness > best_idealness:
+                    best_idealness = idealness
+                    most_ideal = index
+            most_ideal_tiles.append(most_ideal)
+        self._most_ideal_tiles[key] = most_ideal_tiles
+        return most_ideal_tiles
 
     def _get_direction_from_endpoints(self, end_points):
         """Prints a message to the games debug output
@@ -134,17 +483,23 @@ class ShortestPathFinder:
             direction[1] = -1
         return direction
 
-    def _get_idealness(self, location, end_points):
+    def _get_idealness(self, location, end_points, direction=None):
         """Get the idealness of a tile, the reachable tile the unit most wants to path to.
         Better self destruct locations are more ideal. The endpoints are perfectly ideal. 
 
+        Args:
+            * location: The location to rate
+            * end_points: The end points of the unit, should be a list of edge locations
+            * direction: The direction of end_points, computed from them if None
+
         Returns:
             A location the unit will attempt to reach
         """
         if location in end_points:
             return sys.maxsize
 
-        direction = self._get_direction_from_endpoints(end_points)
+        if direction is None:
+            direction = self._get_direction_from_endpoints(end_points)
 
         idealness = 0
         if direction[1] == 1:
@@ -159,81 +514,147 @@ class ShortestPathFinder:
         return idealness
 
     def _validate(self, ideal_tile, end_points):
-        """Breadth first search of the grid, setting the pathlengths of each node
+        """Breadth first search of the grid, setting the pathlengths of each node.
+        Pathlengths are cached per edge or self destruct tile until the blocked locations change.
 
         """
         #VALIDATION
-        #Add our most ideal tiles to current
-        current = queue.Queue()
+        #A pathlength of -1 marks a tile the validation step has not visited yet
+        blocked = self._blocked
         if ideal_tile in end_points:
-            for location in end_points:
-               current.put(location)
-               #Set current pathlength to 0
-               self.game_map[location[0]][location[1]].pathlength = 0
-               self.game_map[location[0]][location[1]].visited_validate = True
+            cache = self._edge_pathlengths
+            key = self._get_endpoints_key(end_points)
         else:
-            current.put(ideal_tile)
-            self.game_map[ideal_tile[0]][ideal_tile[1]].pathlength = 0
-            self.game_map[ideal_tile[0]][ideal_tile[1]].visited_validate = True
+            cache = self._self_destruct_pathlengths
+            key = ideal_tile[0] * ARENA_SIZE + ideal_tile[1]
+        pathlength = cache.get(key)
+        if pathlength is not None:
+            self._pathlength = pathlength
+            return
+        pathlength = array('i', _NO_PATHLENGTH)
+        cache[key] = pathlength
+        self._pathlength = pathlength
+        if self.backend == NUMPY_BACKEND:
+            self._validate_numpy(pathlength, end_points if ideal_tile in end_points else [ideal_tile])
+            return
 
-        #While current is not empty
-        while not current.empty():
-            current_location = current.get()
-            current_node = self.game_map[current_location[0]][current_location[1]]
-            for neighbor in self._get_neighbors(current_location):
-                if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
-                    continue
+        #Add our most ideal tiles to current
+        current = deque()
+        for location in (end_points if ideal_tile in end_points else [ideal_tile]):
+            index = location[0] * ARENA_SIZE + location[1]
+            current.append(index)
+            #Set current pathlength to 0
+            pathlength[index] = 0
 
-                neighbor_node = self.game_map[neighbor[0]][neighbor[1]]
-                if not neighbor_node.visited_validate and not current_node.blocked:
-                    neighbor_node.pathlength = current_node.pathlength + 1
-                    neighbor_node.visited_validate = True
-                    current.put(neighbor)
+        #While current is not empty
+        while current:
+            current_index = current.popleft()
+            if blocked[current_index]:
+                continue
+            next_pathlength = pathlength[current_index] + 1
+            for neighbor in _NEIGHBORS[current_index]:
+                if not blocked[neighbor] and pathlength[neighbor] == -1:
+                    pathlength[neighbor] = next_pathlength
+                    current.append(neighbor)
 
         #debug_write("Print after validate")
         #self.print_map()
         return
 
+    def _get_numpy_open_tiles(self):
+        """Gets a 28x28 NumPy boolean array, indexed [x, y], that is True for unblocked tiles inside the arena
+        """
+        blocked = np.frombuffer(self._blocked, dtype=np.uint8).reshape(ARENA_SIZE, ARENA_SIZE)
+        return ARENA_MASK_ARRAY & (blocked == 0)
+
+    def _expand_numpy(self, frontier):
+        """Gets the tiles adjacent to any tile of a NumPy boolean array by shifting it one step in each direction
+        """
+        expanded = np.zeros_like(frontier)
+        expanded[:, 1:] |= frontier[:, :-1]
+        expanded[:, :-1] |= frontier[:, 1:]
+        expanded[1:, :] |= frontier[:-1, :]
+        expanded[:-1, :] |= frontier[1:, :]
+        return expanded
+
+    def _validate_numpy(self, pathlength, sources):
+        """NumPy implementation of the validation search, expanding one wavefront of tiles per step
+        """
+        open_tiles = self._get_numpy_open_tiles()
+        distance = np.full((ARENA_SIZE, ARENA_SIZE), -1, dtype=np.intc)
+        frontier = np.zeros((ARENA_SIZE, ARENA_SIZE), dtype=bool)
+        for location in sources:
+            frontier[location[0], location[1]] = True
+        distance[frontier] = 0
+        reached = frontier.copy()
+        #Blocked sources keep a pathlength of 0 but are never expanded
+        frontier &= open_tiles
+        step = 0
+        while frontier.any():
+            step += 1
+            frontier = self._expand_numpy(frontier) & open_tiles & ~reached
+            distance[frontier] = step
+            reached |= frontier
+        pathlength[:] = array('i', distance.ravel().tolist())
+
+    def _label_components_numpy(self):
+        """NumPy implementation of _label_components, flooding each pocket as a series of wavefronts
+        """
+        unlabelled = self._get_numpy_open_tiles()
+        labels = np.full((ARENA_SIZE, ARENA_SIZE), -1, dtype=np.intc)
+        self._component_tiles = []
+        while unlabelled.any():
+            pocket = np.zeros((ARENA_SIZE, ARENA_SIZE), dtype=bool)
+            pocket.flat[np.flatnonzero(unlabelled)[0]] = True
+            frontier = pocket
+            while frontier.any():
+                frontier = self._expand_numpy(frontier) & unlabelled & ~pocket
+                pocket |= frontier
+            labels[pocket] = len(self._component_tiles)
+            self._component_tiles.append(np.flatnonzero(pocket).tolist())
+            unlabelled &= ~pocket
+        self._component[:] = array('i', labels.ravel().tolist())
+
     def _get_path(self, start_point, end_points):
         """Once all nodes are validated, and a target is found, the unit can path to its target
 
         """
         #GET THE PATH
         path = [start_point]
-        current = start_point
+        current = start_point[0] * ARENA_SIZE + start_point[1]
         move_direction = 0
 
-        while not self.game_map[current[0]][current[1]].pathlength == 0:
-            #debug_write("current tile {} has cost {}".format(current, self.game_map[current[0]][current[1]].pathlength))
+        while not self._pathlength[current] == 0:
+            #debug_write("current tile {} has cost {}".format(_LOCATIONS[current], self._pathlength[current]))
             next_move = self._choose_next_move(current, move_direction, end_points)
-            #debug_write(next_move)
+            #debug_write(_LOCATIONS[next_move])
 
-            if current[0] == next_move[0]:
+            #Tiles with the same x coordinate share the same index // ARENA_SIZE
+            if current // ARENA_SIZE == next_move // ARENA_SIZE:
                 move_direction = self.VERTICAL
             else:
                 move_direction = self.HORIZONTAL
-            path.append(next_move)
+            path.append(list(_LOCATIONS[next_move]))
             current = next_move
         
         #debug_write(path)
         return path
   
-    def _choose_next_move(self, current_point, previous_move_direction, end_points):
-        """Given the current location and adjacent locations, return the best 'next step' for a given unit to take
+    def _choose_next_move(self, current_index, previous_move_direction, end_points):
+        """Given the current tile index and adjacent tiles, return the index of the best 'next step' for a given unit to take
         """
-        neighbors = self._get_neighbors(current_point)
-        #debug_write("Unit at {} previously moved {} and has these neighbors {}".format(current_point, previous_move_direction, neighbors))
-
-        ideal_neighbor = current_point
-        best_pathlength = self.game_map[current_point[0]][current_point[1]].pathlength
-        for neighbor in neighbors:
-            #debug_write("Comparing champ {} and contender {}".format(ideal_neighbor, neighbor))
-            if not self.game_state.game_map.in_arena_bounds(neighbor) or self.game_map[neighbor[0]][neighbor[1]].blocked:
+        current_point = _LOCATIONS[current_index]
+        #debug_write("Unit at {} previously moved {} and has these neighbors {}".format(current_point, previous_move_direction, _NEIGHBORS[current_index]))
+
+        ideal_neighbor = current_index
+        best_pathlength = self._pathlength[current_index]
+        for neighbor in _NEIGHBORS[current_index]:
+            #debug_write("Comparing champ {} and contender {}".format(_LOCATIONS[ideal_neighbor], _LOCATIONS[neighbor]))
+            if self._blocked[neighbor]:
                 continue
 
             new_best = False
-            x, y = neighbor
-            current_pathlength = self.game_map[x][y].pathlength
+            current_pathlength = self._pathlength[neighbor]
 
             #Filter by pathlength
             if current_pathlength > best_pathlength:
@@ -243,13 +664,13 @@ class ShortestPathFinder:
                 new_best = True
 
             #Filter by direction based on prev move
-            if not new_best and not self._better_direction(current_point, neighbor, ideal_neighbor, previous_move_direction, end_points):
+            if not new_best and not self._better_direction(current_point, _LOCATIONS[neighbor], _LOCATIONS[ideal_neighbor], previous_move_direction, end_points):
                 continue
 
             ideal_neighbor = neighbor
             best_pathlength = current_pathlength
 
-        #debug_write("Gave unit at {} new tile {}".format(current_point, ideal_neighbor))
+        #debug_write("Gave unit at {} new tile {}".format(current_point, _LOCATIONS[ideal_neighbor]))
         return ideal_neighbor
 
     def _better_direction(self, prev_tile, new_tile, prev_best, previous_move_direction, end_points):
@@ -299,9 +720,9 @@ class ShortestPathFinder:
 
         for y in range(28):
             for x in range(28):
-                node = self.game_map[x][28 - y - 1]
-                if not node.blocked and not node.pathlength == -1:
-                    self._print_justified(node.pathlength)
+                index = x * ARENA_SIZE + (28 - y - 1)
+                if not self._blocked[index] and not self._pathlength[index] == -1:
+                    self._print_justified(self._pathlength[index])
                 else:
                     sys.stderr.write("   ")
             debug_write("")
@@ -314,3 +735,65 @@ class ShortestPathFinder:
             sys.stderr.write(" ")
         sys.stderr.write(str(number))
         sys.stderr.write(" ")
+
+
+class PathTableEntry:
+    """The precomputed path of a hypothetical unit, see PathTable
+
+    Attributes :
+        * start (list): The [x, y] location the unit starts at
+        * target_edge (int): The edge the unit is trying to reach, game_map.TOP_RIGHT, game_map.BOTTOM_LEFT, etc.
+        * path (list): The locations the unit would walk through, as find_path_to_edge returns them, or None if the start is blocked
+        * length (int): The number of steps the unit would take, or None if the start is blocked
+        * self_destructs (bool): True if the unit can't reach its target edge and self destructs at the end of its path
+
+    """
+    def __init__(self, start, target_edge, path, self_destructs):
+        self.start = [int(start[0]), int(start[1])]
+        self.target_edge = target_edge
+        self.path = path
+        self.length = None if path is None else len(path) - 1
+        self.self_destructs = self_destructs
+
+    def __repr__(self):
+        return "PathTableEntry(start={}, target_edge={}, length={}, self_destructs={})".format(self.start, self.target_edge, self.length, self.self_destructs)
+
+
+class PathTable:
+    """A table of precomputed paths indexed by start location
+
+    table[location] returns the PathTableEntry for a start location, given as a list or tuple,
+    and iterating over the table yields the entries in the order they were computed.
+    Tables may be shared between callers, so their entries and paths should not be modified.
+
+    """
+    def __init__(self, entries):
+        self.entries = entries
+        self.__entries_by_index = {}
+        for entry in entries:
+            self.__entries_by_index[entry.start[0] * ARENA_SIZE + entry.start[1]] = entry
+
+    def __getitem__(self, location):
+        return self.__entries_by_index[int(location[0]) * ARENA_SIZE + int(location[1])]
+
+    def __contains__(self, location):
+        return int(location[0]) * ARENA_SIZE + int(location[1]) in self.__entries_by_index
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, location, default=None):
+        """Gets the entry for a start location
+
+        Args:
+            * location: The start location to look up
+            * default: What to return if the location is not in the table
+
+        Returns:
+            The PathTableEntry starting at location, or default
+
+        """
+        return self.__entries_by_index.get(int(location[0]) * ARENA_SIZE + int(location[1]), default)
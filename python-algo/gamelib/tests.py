@@ -2,6 +2,9 @@ import unittest
 import json
 from .game_state import GameState
 from .unit import GameUnit
+from . import navigation
+from . import util
+from . import game_map as game_map_module
 
 class BasicTests(unittest.TestCase):
 
@@ -195,6 +198,31 @@ class BasicTests(unittest.TestCase):
     def test_basic(self):
         self.assertEqual(True, True, "It's the end of the world as we know it, and I feel fine")
 
+    def test_lazy_parsing(self):
+        config = self.make_turn_0_map().config
+        turn = json.dumps({"p2Units":[[],[],[[13,14,90.0,"1"]],[],[],[],[]],"turnInfo":[0,3,-1],"p1Stats":[30.0,25.0,5.0,0],"p1Units":[[[13,0,75.0,"2"]],[],[],[],[],[],[]],"p2Stats":[28.0,20.0,6.0,0],"events":{}})
+        eager = GameState(config, turn)
+        lazy = GameState(config, turn, lazy=True)
+        self.assertEqual(None, lazy._GameState__game_map, "Units should not be parsed until the map is used")
+        self.assertEqual(eager.get_resources(1), lazy.get_resources(1))
+        self.assertEqual(3, lazy.turn_number)
+        self.assertEqual(28, lazy.enemy_health)
+        self.assertEqual(None, lazy._GameState__game_map, "Reading resources should not parse units")
+        self.assertEqual("FF", lazy.contains_stationary_unit([13, 0]).unit_type)
+        self.assertEqual(list(eager.game_map.iter_occupied()), list(lazy.game_map.iter_occupied()))
+        self.assertEqual(eager.find_path_to_edge([14, 0]), lazy.find_path_to_edge([14, 0]))
+
+    def test_parse_json_once(self):
+        config = self.make_turn_0_map().config
+        turn = json.dumps({"p2Units":[[],[],[],[],[],[],[]],"turnInfo":[0,3,-1],"p1Stats":[30.0,25.0,5.0,0],"p1Units":[[[13,0,75.0,"2"]],[],[],[],[],[],[]],"p2Stats":[28.0,20.0,6.0,0],"events":{}})
+        decoded = util.parse_json(turn)
+        self.assertIs(decoded, util.parse_json(turn), "The same message should only be decoded once")
+        self.assertEqual(json.loads(turn), decoded)
+        from_string = GameState(config, turn)
+        from_dict = GameState(config, decoded)
+        self.assertEqual(from_string.get_resources(1), from_dict.get_resources(1))
+        self.assertEqual(list(from_string.game_map.iter_occupied()), list(from_dict.game_map.iter_occupied()))
+
     def test_simple_fields(self):
         game = self.make_turn_0_map()
         self.assertEqual(5, game.get_resource(game.MP), "I should have 5 MP")
@@ -215,6 +243,23 @@ class BasicTests(unittest.TestCase):
         self.assertEqual([("DF", 13, 6)], game._build_stack, "Build queue is wrong!")
         self.assertEqual([("SI", 13, 0), ("SI", 13, 0), ("SI", 13, 0)], game._deploy_stack, "Deploy queue is wrong!")
 
+    def test_bulk_spawning(self):
+        game = self.make_turn_0_map()
+        game.suppress_warnings(True)
+        self.assertEqual(5, game.attempt_spawn("PI", [13, 0], 1000), "We should spawn as many units as we can afford")
+        self.assertEqual(0, game.get_resource(game.MP))
+        self.assertEqual([("PI", 13, 0)] * 5, game._deploy_stack)
+        self.assertEqual(5, len(game.game_map[13, 0]))
+        units = game.game_map[13, 0]
+        self.assertEqual(5, len(set(map(id, units))), "Every spawned unit should be its own GameUnit")
+        self.assertEqual(0, game.attempt_spawn("PI", [14, 0], 1000), "We should not spawn units we can't afford")
+
+        game = self.make_turn_0_map()
+        game.suppress_warnings(True)
+        self.assertEqual(0, game.attempt_spawn("PI", [13, 1], 3), "Mobile units must be spawned on an edge")
+        self.assertEqual(1, game.attempt_spawn("EI", [[13, 0], [14, 0]], 2), "The first location should use up our resources")
+        self.assertEqual(2, game.get_resource(game.MP))
+
     def test_trivial_functions(self):
         game = self.make_turn_0_map()
 
@@ -235,10 +280,304 @@ class BasicTests(unittest.TestCase):
             game.game_map.add_unit("FF", [13,13])
         self.assertEqual(1, len(game.game_map[13,13]), "Towers seem to be stacking")
         
+    def test_find_paths_to_edge(self):
+        game = self.make_turn_0_map()
+        for location in [[10, 13], [11, 13], [12, 13], [13, 12], [14, 12], [15, 12], [13, 6]]:
+            game.game_map.add_unit("FF", location)
+        starts = game.game_map.get_edge_locations(game.game_map.BOTTOM_LEFT) + game.game_map.get_edge_locations(game.game_map.BOTTOM_RIGHT)
+        starts.append([13, 6])
+        #Compare against the pathfinder rather than the path cache
+        game.path_cache_size = 0
+        paths = game.find_paths_to_edge(starts)
+        self.assertEqual(len(starts), len(paths), "There should be one path per start location")
+        self.assertEqual(None, paths[-1], "Pathing from a blocked tile should fail")
+        for start, path in zip(starts[:-1], paths[:-1]):
+            self.assertEqual(game.find_path_to_edge(start), path, "Batched pathing disagrees with single pathing from {}".format(start))
+
+    def test_find_path_under_destruction(self):
+        game = self.make_turn_0_map()
+        game.path_cache_size = 0
+        self.assertEqual(game.find_path_to_edge([13, 0]), game.find_path_under_destruction([13, 0], []), "Without events the path should not change")
+        for x in range(28):
+            if game.game_map.in_arena_bounds([x, 13]):
+                game.game_map.add_unit("FF", [x, 13])
+        blocked_path = game.find_path_to_edge([13, 0])
+        path = game.find_path_under_destruction([13, 0], [(3, [20, 13])])
+        self.assertEqual(blocked_path[:4], path[:4], "The unit should follow its original path until the wall breaks")
+        self.assertIn(path[-1], game.game_map.get_edge_locations(game.game_map.TOP_RIGHT), "The unit should escape through the destroyed wall")
+        self.assertIn([20, 13], path, "The unit should walk through the destroyed wall")
+        self.assertEqual(blocked_path, game.find_path_to_edge([13, 0]), "The destroyed wall should be restored afterwards")
+        late_path = game.find_path_under_destruction([13, 0], [(len(blocked_path), [20, 13])])
+        self.assertEqual(blocked_path, late_path, "Walls destroyed after the unit self destructs should not matter")
+
+    def test_spawn_path_table(self):
+        game = self.make_turn_0_map()
+        for x in range(28):
+            if game.game_map.in_arena_bounds([x, 13]):
+                game.game_map.add_unit("FF", [x, 13])
+        game.game_map.add_unit("FF", [5, 8])
+        game.game_map.remove_unit([24, 13])
+        game.path_cache_size = 0
+        table = game.spawn_path_table()
+        self.assertEqual(28, len(table), "There should be one entry per friendly edge location")
+        self.assertIs(table, game.spawn_path_table(), "The table should be reused while the map is unchanged")
+        self.assertEqual(None, table[[5, 8]].path, "Blocked spawn locations should have no path")
+        for entry in table:
+            if entry.path is None:
+                continue
+            self.assertEqual(game.find_path_to_edge(entry.start), entry.path, "Table disagrees with single pathing from {}".format(entry.start))
+            self.assertEqual(len(entry.path) - 1, entry.length)
+            self.assertEqual(game.get_target_edge(entry.start), entry.target_edge)
+            self.assertEqual(not entry.path[-1] in game.game_map.get_edge_locations(entry.target_edge), entry.self_destructs)
+        self.assertFalse(table[(13, 0)].self_destructs, "Units should walk through the gap in the wall")
+        game.game_map.add_unit("FF", [24, 13])
+        table = game.spawn_path_table()
+        self.assertTrue(table[(13, 0)].self_destructs, "Walled in units should self destruct")
+
+    def test_enemy_path_table(self):
+        game = self.make_turn_0_map()
+        for location in [[13, 14], [14, 14], [12, 15], [15, 15], [10, 20], [20, 20]]:
+            game.game_map.add_unit("FF", location, 1)
+        game.path_cache_size = 0
+        table = game.enemy_path_table()
+        spawn_table = game.spawn_path_table()
+        self.assertEqual(28, len(table), "There should be one entry per enemy edge location")
+        self.assertIs(table, game.enemy_path_table(), "The table should be reused while the map is unchanged")
+        self.assertIs(spawn_table, game.spawn_path_table(), "Enemy and friendly tables should be cached side by side")
+        self.assertEqual(None, table.get([13, 0]), "Friendly edge locations are not in the enemy table")
+        for entry in table:
+            self.assertIn(entry.target_edge, [game.game_map.BOTTOM_LEFT, game.game_map.BOTTOM_RIGHT])
+            self.assertEqual(game.find_path_to_edge(entry.start), entry.path, "Table disagrees with single pathing from {}".format(entry.start))
+            self.assertFalse(entry.self_destructs, "Enemy units should reach our edges on an open map")
+
+    @unittest.skipIf(navigation.np is None, "NumPy is not installed")
+    def test_numpy_backend_parity(self):
+        game = self.make_turn_0_map()
+        #A wall with a gap, a sealed pocket and a few obstacles to exercise tie-breaking
+        for x in range(28):
+            if game.game_map.in_arena_bounds([x, 13]) and not x == 20:
+                game.game_map.add_unit("FF", [x, 13])
+        for location in [[12, 3], [13, 4], [14, 3], [13, 2], [5, 9], [6, 8], [20, 7], [9, 20], [18, 17]]:
+            game.game_map.add_unit("FF", location)
+
+        python_finder = navigation.ShortestPathFinder(navigation.PYTHON_BACKEND)
+        numpy_finder = navigation.ShortestPathFinder(navigation.NUMPY_BACKEND)
+        for edge in game.game_map.get_edges():
+            starts = [location for location in game.game_map if not game.contains_stationary_unit(location)]
+            self.assertEqual(python_finder.navigate_multiple_starts(starts, edge, game), numpy_finder.navigate_multiple_starts(starts, edge, game),
+                "NumPy and Python backends disagree on paths towards {}".format(edge[0]))
+
+    def test_path_cache(self):
+        game = self.make_turn_0_map()
+        path = game.find_path_to_edge([13, 0])
+        self.assertEqual((0, 1), (game.path_cache_hits, game.path_cache_misses), "First query should miss the cache")
+        path.append([0, 0])
+        self.assertEqual(path[:-1], game.find_path_to_edge([13, 0]), "Cached paths should not be affected by callers")
+        self.assertEqual((1, 1), (game.path_cache_hits, game.path_cache_misses), "Repeated query should hit the cache")
+
+        game.game_map.add_unit("FF", [14, 1])
+        self.assertNotEqual(path[:-1], game.find_path_to_edge([13, 0]), "Placing a wall should invalidate cached paths")
+        game.game_map.remove_unit([14, 1])
+        self.assertEqual(path[:-1], game.find_path_to_edge([13, 0]), "Paths for a previous layout should still be cached")
+        self.assertEqual((2, 2), (game.path_cache_hits, game.path_cache_misses), "Cache counters are wrong")
+
+        game.path_cache_size = 1
+        game.find_path_to_edge([14, 0])
+        self.assertEqual(1, len(game._path_cache), "Cache should respect its size limit")
+
+    def test_path_cache_no_path(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("DF", [13, 14], 1)
+        game.game_map[13, 14].clear()
+        path = game.find_path_to_edge([13, 14])
+        self.assertEqual(path, game.find_path_to_edge([13, 14]), "Missing paths should not break the cache")
+        self.assertEqual([path], game.find_paths_to_edge([[13, 14]]), "Missing paths should not break batch pathing")
+        game.game_map.refresh_location([13, 14])
+        self.assertEqual([13, 14], game.find_path_to_edge([13, 14])[0], "Refreshed locations should be pathable")
+
+    def test_set_blocked(self):
+        game = self.make_turn_0_map()
+        end_points = game.game_map.get_edge_locations(game.game_map.TOP_RIGHT)
+        pathfinder = game._shortest_path_finder
+        original_path = game.find_path_to_edge([13, 0])
+
+        pathfinder.set_blocked([14, 1])
+        what_if_path = pathfinder.find_path([13, 0], end_points)
+        game.game_map.add_unit("FF", [14, 1])
+        self.assertEqual(game.find_path_to_edge([13, 0]), what_if_path, "Path with a hypothetical wall is wrong")
+
+        game.game_map.remove_unit([14, 1])
+        self.assertEqual(original_path, game.find_path_to_edge([13, 0]), "Path did not recover after removing the wall")
+        pathfinder.set_blocked([14, 1])
+        pathfinder.set_blocked([14, 1], False)
+        self.assertEqual(original_path, pathfinder.find_path([13, 0], end_points), "Unblocking a hypothetical wall should restore the path")
+
+    def test_blocked_mask(self):
+        game = self.make_turn_0_map()
+        mask = game.game_map.get_blocked_mask()
+        self.assertEqual(0, sum(mask), "An empty map should not have blocked locations")
+        game.game_map.add_unit("EI", [13,13])
+        self.assertEqual(0, mask[13 * 28 + 13], "Mobile units should not block pathing")
+        game.game_map.add_unit("FF", [13,13])
+        game.attempt_spawn("DF", [13,6])
+        self.assertEqual(1, mask[13 * 28 + 13], "Walls should block pathing")
+        self.assertEqual(1, mask[13 * 28 + 6], "Spawned turrets should block pathing")
+        game.game_map.remove_unit([13,13])
+        self.assertEqual(0, mask[13 * 28 + 13], "Removed walls should no longer block pathing")
+
+    def test_structure_hash(self):
+        game = self.make_turn_0_map()
+        empty_hash = game.game_map.get_structure_hash()
+        game.game_map.add_unit("EI", [13,13])
+        self.assertEqual(empty_hash, game.game_map.get_structure_hash(), "Mobile units should not change the structure hash")
+        game.game_map.add_unit("FF", [13,13])
+        wall_hash = game.game_map.get_structure_hash()
+        self.assertNotEqual(empty_hash, wall_hash, "Adding a structure should change the hash")
+        game.game_map.remove_unit([13,13])
+        game.game_map.add_unit("DF", [13,13])
+        self.assertNotEqual(wall_hash, game.game_map.get_structure_hash(), "The structure type should change the hash")
+        game.game_map.remove_unit([13,13])
+        game.game_map.add_unit("FF", [13,13], 1)
+        self.assertNotEqual(wall_hash, game.game_map.get_structure_hash(), "The structure owner should change the hash")
+        game.game_map.remove_unit([13,13])
+        self.assertEqual(empty_hash, game.game_map.get_structure_hash(), "Removing every structure should restore the hash")
+
+        game.game_map.add_unit("FF", [13,13])
+        self.assertEqual(1, game.attempt_upgrade([13,13]))
+        self.assertNotEqual(wall_hash, game.game_map.get_structure_hash(), "Upgrading a structure should change the hash")
+        other = self.make_turn_0_map()
+        other.game_map.add_unit("FF", [13,13])
+        self.assertEqual(wall_hash, other.game_map.get_structure_hash(), "Equal layouts should have equal hashes")
+
+    def test_tile_ids(self):
+        game = self.make_turn_0_map()
+        game_map = game.game_map
+        self.assertEqual(420, game_map_module.TILE_COUNT, "The arena should have 420 tiles")
+        self.assertEqual(list(range(420)), [game_map.get_tile_id(location) for location in game_map], "Tile ids should follow map iteration order")
+        self.assertEqual([13, 0], game_map.get_tile_location(0))
+        self.assertEqual([14, 27], game_map.get_tile_location(419))
+        game.suppress_warnings(True)
+        self.assertEqual(None, game_map.get_tile_id([0, 0]), "Locations outside the arena have no id")
+        self.assertEqual(None, game_map.get_tile_id([13.9, 0.5]), "Fractional locations have no id")
+        self.assertEqual(None, game_map.get_tile_location(420))
+        game.suppress_warnings(False)
+
+        game_map.add_unit("DF", [13, 11], 1)
+        game_map.add_unit("EI", [12, 9], 1)
+        tile_id = game_map.get_tile_id([13, 9])
+        self.assertIs(game_map[13, 9], game_map.get_units_at_tile(tile_id))
+        self.assertEqual([game_map.get_tile_location(t) for t in game_map.get_tile_ids_in_range(tile_id, 3.5)], game_map.get_locations_in_range([13, 9], 3.5))
+        self.assertEqual(game.get_attackers([13, 9], 0), game.get_attackers_at_tile(tile_id, 0))
+        self.assertTrue(game.contains_stationary_unit_at_tile(game_map.get_tile_id([13, 11])))
+        self.assertFalse(game.contains_stationary_unit_at_tile(game_map.get_tile_id([12, 9])))
+        self.assertEqual([game_map.get_tile_location(t) for t in game_map.get_edge_tile_ids(game_map.BOTTOM_LEFT)], game_map.get_edge_locations(game_map.BOTTOM_LEFT))
+
+    def test_arena_mask(self):
+        game = self.make_turn_0_map()
+        game_map = game.game_map
+        locations = [[x, y] for x in range(-1, 29) for y in range(-1, 29)] + [[13.5, 0], [0.5, 13.5], [27.5, 13]]
+        expected = [game_map.in_arena_bounds(location) for location in locations]
+        self.assertEqual(expected, game_map.in_arena_bounds_many(locations))
+        self.assertEqual(420, sum(map(sum, game_map_module.ARENA_MASK)), "The mask should cover the 420 arena locations")
+        self.assertEqual([[x, y] for x in range(28) for y in range(28) if game_map_module.ARENA_MASK[x][y]], sorted(game_map))
+        self.assertTrue(game_map.in_arena_bounds([13.5, 0]), "Locations between tiles should still be checked")
+        self.assertFalse(game_map.in_arena_bounds([0, 0]))
+        if game_map_module.ARENA_MASK_ARRAY is not None:
+            self.assertEqual(420, int(game_map_module.ARENA_MASK_ARRAY.sum()))
+            self.assertTrue(game_map_module.ARENA_MASK_ARRAY[13, 0])
+
+    def test_edges(self):
+        game = self.make_turn_0_map()
+        game_map = game.game_map
+        edges = game_map.get_edges()
+        self.assertEqual([[14, 27], [15, 26]], edges[game_map.TOP_RIGHT][:2])
+        self.assertEqual([[13, 0], [12, 1]], edges[game_map.BOTTOM_LEFT][:2])
+        edges[game_map.BOTTOM_LEFT].clear()
+        game_map.get_edge_locations(game_map.BOTTOM_RIGHT)[0][0] = 0
+        self.assertEqual(14, len(game_map.get_edge_locations(game_map.BOTTOM_LEFT)), "Callers should get fresh edge lists")
+        self.assertEqual([14, 0], game_map.get_edge_locations(game_map.BOTTOM_RIGHT)[0], "Callers should get fresh edge lists")
+        for edge, edge_locations in enumerate(game_map.get_edges()):
+            for location in game_map:
+                self.assertEqual(location in edge_locations, game_map.is_on_edge(location, edge))
+        self.assertTrue(game_map.is_on_edge([13, 0]))
+        self.assertFalse(game_map.is_on_edge([13, 1]))
+        self.assertFalse(game_map.is_on_edge([-1, 0]))
+        self.assertTrue(game.can_spawn("PI", [0, 13]), "Mobile units can spawn on our edges")
+        self.assertTrue(game.can_spawn("PI", (27, 13)), "Locations can be given as tuples")
+        game.suppress_warnings(True)
+        self.assertFalse(game.can_spawn("PI", [13, 1]), "Mobile units must spawn on an edge")
+        self.assertFalse(game.can_spawn("PI", [14, 27]), "Mobile units can't spawn on enemy edges")
+
+    def test_map_iteration(self):
+        game = self.make_turn_0_map()
+        game_map = game.game_map
+        locations = list(game_map)
+        self.assertEqual(420, len(locations), "The arena should have 420 locations")
+        self.assertEqual([[13, 0], [14, 0], [12, 1]], locations[:3], "Locations should be iterated by row from the bottom")
+        self.assertEqual(420 * 420, sum(1 for _ in game_map for _ in game_map), "Nested iteration over the map should work")
+
+        game_map.add_unit("FF", [3, 12])
+        game_map.add_unit("DF", [20, 20], 1)
+        game_map.add_unit("EI", [13, 13], 1)
+        game_map.add_unit("PI", [13, 13])
+        self.assertEqual([[3, 12], [13, 13], [20, 20]], list(game_map.iter_occupied()))
+        self.assertEqual([[3, 12], [20, 20]], list(game_map.iter_structures()))
+        self.assertEqual([[20, 20]], list(game_map.iter_structures(1)))
+        game_map.remove_unit([20, 20])
+        game_map.add_unit("FF", [20, 20], 0)
+        self.assertEqual([], list(game_map.iter_structures(1)), "Replaced structures should change owner")
+        self.assertEqual([[3, 12], [20, 20]], list(game_map.iter_structures(0)))
+        game_map.remove_unit([13, 13])
+        self.assertEqual([[3, 12], [20, 20]], list(game_map.iter_occupied()))
+
+    def test_unit_index(self):
+        game = self.make_turn_0_map()
+        game_map = game.game_map
+        self.assertEqual(0, game_map.get_unit_count("DF", 1))
+        game_map.add_unit("DF", [20, 20], 1)
+        game_map.add_unit("DF", [10, 20], 1)
+        game_map.add_unit("DF", [13, 3], 0)
+        game_map.add_unit("PI", [13, 0])
+        game_map.add_unit("PI", [13, 0])
+        self.assertEqual(2, game_map.get_unit_count("DF", 1))
+        self.assertEqual(1, game_map.get_unit_count("DF", 0))
+        self.assertEqual(2, game_map.get_unit_count("PI"), "Stacked mobile units should each be counted")
+        self.assertEqual([[10, 20], [20, 20]], game_map.get_unit_locations("DF", 1))
+        self.assertEqual([[13, 0]], game_map.get_unit_locations("PI", 0))
+        game_map[20, 20] = []
+        game_map.remove_unit([13, 0])
+        game_map.add_unit("FF", [13, 3], 0)
+        self.assertEqual(1, game_map.get_unit_count("DF", 1))
+        self.assertEqual(0, game_map.get_unit_count("DF", 0), "Replaced structures should no longer be counted")
+        self.assertEqual(1, game_map.get_unit_count("FF", 0))
+        self.assertEqual(0, game_map.get_unit_count("PI"))
+        self.assertEqual([], game_map.get_unit_locations("PI", 0))
+
     def test_get_units_in_range(self):
         game = self.make_turn_0_map()
         self.assertEqual(1, len(game.game_map.get_locations_in_range([13,13], 0)), "We should be in 0 range of ourself")
         self.assertEqual(37, len(game.game_map.get_locations_in_range([13,13], 3.5)), "Wrong number of tiles in range")
+        locations = game.game_map.get_locations_in_range([13,13], 3.5)
+        locations[0][0] = -1
+        locations.clear()
+        self.assertEqual(37, len(game.game_map.get_locations_in_range([13,13], 3.5)), "Cached ranges should not be affected by callers")
+        self.assertEqual([], [l for l in game.game_map.get_locations_in_range([13,13], 3.5) if l[0] == -1])
+        self.assertEqual(9, len(game.game_map.get_locations_in_range([0,13], 2.5)), "Ranges should be clipped to the arena")
+
+    def test_find_path_to_edge(self):
+        game = self.make_turn_0_map()
+        path = game.find_path_to_edge([13, 0])
+        self.assertEqual(29, len(path), "Path across an empty map has the wrong length")
+        self.assertEqual([[13, 0], [13, 1], [14, 1], [14, 2]], path[:4], "Units should zig-zag towards their target edge")
+        self.assertEqual([27, 14], path[-1], "Path should end on the top right edge")
+        self.assertEqual(path, game.find_path_to_edge([13, 0]), "Repeated path queries should agree")
+
+        for x in range(28):
+            if game.game_map.in_arena_bounds([x, 13]):
+                game.game_map.add_unit("FF", [x, 13])
+        path = game.find_path_to_edge([13, 0])
+        self.assertEqual([26, 12], path[-1], "A walled in unit should self destruct at its most ideal tile")
+        self.assertEqual(None, game.find_path_to_edge([13, 13]), "Pathing from a blocked tile should fail")
 
     def _test_get_attackers(self):
         game = self.make_turn_0_map()
@@ -256,6 +595,63 @@ class BasicTests(unittest.TestCase):
         game.game_map.add_unit("DF", [14,14], 1)
         self.assertEqual(3, len(game.get_attackers([13,13], 0)), "We should be in danger from 3 places")
 
+    def test_attack_coverage(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("DF", [13, 14], 1)
+        game.game_map.add_unit("DF", [12, 14], 1)
+        attackers = game.get_attackers([13, 12], 0)
+        self.assertEqual([[12, 14], [13, 14]], [[unit.x, unit.y] for unit in attackers], "Attackers should be ordered by location")
+        self.assertEqual(sum(unit.damage_i for unit in attackers), game.get_attacker_damage([13, 12], 0))
+        self.assertEqual([], game.get_attackers([13, 14], 1), "Units should not attack their own side")
+        self.assertEqual(0, game.get_attacker_damage([13, 3], 0), "Locations out of range should be safe")
+
+        game.game_map.remove_unit([12, 14])
+        self.assertEqual([[13, 14]], [[unit.x, unit.y] for unit in game.get_attackers([13, 12], 0)], "Removed units should stop attacking")
+        game.game_map.add_unit("FF", [12, 14], 1)
+        self.assertEqual(1, len(game.get_attackers([13, 12], 0)), "Walls should not attack")
+        game.game_map.add_unit("SI", [13, 3], 1)
+        self.assertEqual(1, len(game.get_attackers([13, 1], 0)), "Mobile units that deal damage should attack")
+        self.assertEqual(0, len(game.get_attackers([13, 11], 0)), "Attacks should be limited by range")
+        game.game_map[13, 14][0].upgrade()
+        game.game_map.refresh_location([13, 14])
+        self.assertEqual(1, len(game.get_attackers([13, 11], 0)), "Upgraded turrets should have a longer range")
+
+    def test_path_damage(self):
+        game = self.make_turn_0_map()
+        path = game.find_path_to_edge([13, 0])
+        self.assertEqual((0, 3), game.path_damage(path, "PI", 3), "Nothing should attack units on an empty map")
+        game.game_map.add_unit("DF", [25, 15], 1)
+        expected = sum(game.get_attacker_damage(location, 0) for location in path)
+        damage, survivors = game.path_damage(path, "PI", 3)
+        self.assertEqual(expected, damage, "Scouts should spend one frame on every location")
+        self.assertEqual(3 - min(3, int(damage // 15)), survivors)
+        self.assertEqual(expected * 2, game.path_damage(path, "EI")[0], "Slower units should spend longer in range")
+        game.game_map[25, 15][0].upgrade()
+        game.game_map.refresh_location([25, 15])
+        self.assertGreater(game.path_damage(path, "PI")[0], damage, "Upgraded turrets should deal more damage")
+        game.suppress_warnings(True)
+        self.assertEqual(None, game.path_damage(path, "DF"), "Structures can't walk a path")
+
+    def test_get_target(self):
+        game = self.make_turn_0_map()
+        game.game_map.add_unit("DF", [13, 13], 0)
+        turret = game.game_map[13, 13][0]
+        game.game_map.add_unit("FF", [13, 14], 1)
+        self.assertEqual(None, game.get_target(turret), "Turrets should not attack structures")
+        game.game_map.add_unit("PI", [13, 15], 1)
+        game.game_map.add_unit("PI", [11, 13], 1)
+        target = game.get_target(turret)
+        self.assertEqual([11, 13], [target.x, target.y], "Ties should go to the location found first")
+        game.game_map.add_unit("PI", [12, 14], 1)
+        target = game.get_target(turret)
+        self.assertEqual([12, 14], [target.x, target.y], "Turrets should attack the nearest unit")
+        game.game_map.add_unit("PI", [14, 12], 1)
+        target = game.get_target(turret)
+        self.assertEqual([14, 12], [target.x, target.y], "Equally close units should be chosen by height")
+        game.game_map[12, 14][0].health = 1
+        target = game.get_target(turret)
+        self.assertEqual([12, 14], [target.x, target.y], "Turrets should prefer weaker targets at the same distance")
+
     def test_print_unit(self):
         game = self.make_turn_0_map()
 
@@ -1,5 +1,24 @@
+import json
 import sys
 
+#Use the fastest JSON decoder that is installed, see set_json_decoder
+try:
+    import orjson
+    _json_loads = orjson.loads
+    JSON_DECODER = "orjson"
+except ImportError:
+    try:
+        import ujson
+        _json_loads = ujson.loads
+        JSON_DECODER = "ujson"
+    except ImportError:
+        _json_loads = json.loads
+        JSON_DECODER = "json"
+
+#The last message parse_json decoded, so the same message string is only decoded once
+_last_json_string = None
+_last_json_value = None
+
 
 BANNER_TEXT = "---------------- Starting Your Algo --------------------"
 
@@ -39,3 +58,38 @@ def debug_write(*msg):
     #Printing to STDERR is okay and printed out by the game but doesn't effect turns.
     sys.stderr.write(", ".join(map(str, msg)).strip() + "\n")
     sys.stderr.flush()
+
+def parse_json(json_string):
+    """Decodes a JSON message from the game engine.
+    The last message decoded is remembered, so when AlgoCore, GameState and your
+    algo are all handed the same string it is only decoded once.
+
+    Args:
+        json_string: The message to decode
+
+    Returns:
+        The decoded message. It may be shared with other callers, so it should not be modified.
+
+    """
+    global _last_json_string, _last_json_value
+    if json_string is _last_json_string:
+        return _last_json_value
+    value = _json_loads(json_string)
+    _last_json_string = json_string
+    _last_json_value = value
+    return value
+
+def set_json_decoder(loads, name=None):
+    """Changes the function parse_json uses to decode messages.
+    By default orjson is used if it is installed, then ujson, then the standard library json module.
+
+    Args:
+        loads: A function that takes a JSON string and returns the decoded value, such as json.loads
+        name: A name for the decoder, stored in JSON_DECODER
+
+    """
+    global _json_loads, JSON_DECODER, _last_json_string, _last_json_value
+    _json_loads = loads
+    JSON_DECODER = name if name is not None else getattr(loads, "__module__", str(loads))
+    _last_json_string = None
+    _last_json_value = None